@@ -0,0 +1,48 @@
+"""Benchmark decoding of value-state event tables.
+
+Run from the project root:
+
+    python benchmarks/bench_events.py [entries]
+"""
+
+from __future__ import annotations
+
+import os
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.bulk import HAS_NUMPY, ValueSnapshot
+from loxone_api.events import decode_value_events, iter_value_events
+
+
+def _bench(label: str, func, payload: bytes, entries: int, rounds: int = 20) -> None:
+    func(payload)  # warm up (fills the UUID formatting cache like a long-lived client)
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func(payload)
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<28} {best * 1000:8.2f} ms  {entries / best:14,.0f} entries/s")
+
+
+def main() -> None:
+    entries = int(sys.argv[1]) if len(sys.argv) > 1 else 9000
+    payload = os.urandom(24 * entries)
+
+    print(f"Value-event table: {entries} entries, {len(payload)} bytes")
+    _bench("iter_value_events", lambda p: sum(1 for _ in iter_value_events(p)), payload, entries)
+    _bench("decode_value_events", lambda p: sum(1 for _ in decode_value_events(p)), payload, entries)
+
+    if HAS_NUMPY:
+        snapshot = ValueSnapshot()
+        snapshot.changes(payload, full=True)
+        _bench("ValueSnapshot resync", snapshot.changes, payload, entries)
+    else:
+        print("numpy not installed, skipping ValueSnapshot")
+
+
+if __name__ == "__main__":
+    main()
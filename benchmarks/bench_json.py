@@ -0,0 +1,43 @@
+"""Benchmark parsing of a large LoxAPP3.json response body.
+
+Run from the project root:
+
+    python benchmarks/bench_json.py [controls]
+"""
+
+from __future__ import annotations
+
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.client import HAS_ORJSON, LoxoneClient
+
+from synthetic import make_structure_bytes
+
+
+def _bench(label: str, func, rounds: int = 5) -> None:
+    best = float("inf")
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    print(f"{label:<40} {best * 1000:8.1f} ms")
+
+
+def main() -> None:
+    controls = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    body = make_structure_bytes(controls)
+    noisy = b"\xef\xbb\xbf" + body + b"\x00\x00"
+    print(f"Structure: {controls} controls, {len(body) / 1e6:.1f} MB, orjson={'yes' if HAS_ORJSON else 'no'}")
+
+    _bench("decode to str + json.loads", lambda: json.loads(body.decode("utf-8")))
+    _bench("_parse_json(bytes)", lambda: LoxoneClient._parse_json(body))
+    _bench("_parse_json(bytes with BOM/NUL padding)", lambda: LoxoneClient._parse_json(noisy))
+
+
+if __name__ == "__main__":
+    main()
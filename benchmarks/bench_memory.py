@@ -0,0 +1,115 @@
+"""Benchmark memory held by the control model built from a large structure.
+
+Run from the project root:
+
+    python benchmarks/bench_memory.py [controls]
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import sys
+import tracemalloc
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.structure import StructureParser, build_controls
+
+from synthetic import make_structure, make_structure_bytes
+
+
+@dataclass
+class _DictControl:
+    """The previous model: a plain dataclass holding the structure's own dicts."""
+
+    uuid: str
+    name: str
+    type: str
+    room: Optional[str] = None
+    category: Optional[str] = None
+    states: Dict[str, Any] = field(default_factory=dict)
+    details: Dict[str, Any] = field(default_factory=dict)
+
+
+def _build_dict_controls(structure: Dict[str, Any]) -> Dict[str, _DictControl]:
+    rooms = {uuid: room.get("name") for uuid, room in structure["rooms"].items()}
+    cats = {uuid: cat.get("name") for uuid, cat in structure["cats"].items()}
+    controls = {}
+    for uuid, control in structure["controls"].items():
+        parent = _DictControl(
+            uuid=uuid,
+            name=control["name"],
+            type=control["type"],
+            room=rooms.get(control.get("room")),
+            category=cats.get(control.get("cat")),
+            states=control.get("states") or {},
+            details=control.get("details") or {},
+        )
+        controls[uuid] = parent
+        for sc_uuid, sc in (control.get("subControls") or {}).items():
+            controls[f"{uuid}/{sc_uuid}"] = _DictControl(
+                uuid=f"{uuid}/{sc_uuid}",
+                name=f"{parent.name} - {sc['name']}",
+                type=sc["type"],
+                room=parent.room,
+                category=parent.category,
+                states=sc.get("states") or {},
+                details={**(sc.get("details") or {}), "parent_uuid": uuid, "subcontrol_id": sc_uuid},
+            )
+    return controls
+
+
+def _retained(label: str, controls: int, build) -> None:
+    """Memory still allocated once the structure dict has been dropped."""
+    gc.collect()
+    tracemalloc.start()
+    structure = make_structure(controls)
+    model = build(structure)
+    del structure
+    gc.collect()
+    retained, _peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {retained / 1e6:8.2f} MB for {len(model)} controls")
+
+
+def _peak(label: str, body: bytes, build) -> None:
+    """Peak memory while turning a downloaded body into controls."""
+    gc.collect()
+    tracemalloc.start()
+    model = build(body)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<40} {peak / 1e6:8.2f} MB peak for {len(model)} controls")
+
+
+def _stream(body: bytes, chunk_size: int = 64 * 1024):
+    parser = StructureParser()
+    view = memoryview(body)
+    for start in range(0, len(view), chunk_size):
+        parser.feed(view[start : start + chunk_size])
+    return parser.close().controls
+
+
+def main() -> None:
+    controls = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    print(f"Structure: {controls} controls")
+
+    _retained("dataclass with structure dicts", controls, _build_dict_controls)
+    _retained("build_controls (all details)", controls, build_controls)
+    _retained(
+        "build_controls (detail_keys)",
+        controls,
+        lambda structure: build_controls(structure, detail_keys={"defaultSetpoint"}),
+    )
+
+    body = make_structure_bytes(controls)
+    _peak("json.loads + build_controls", body, lambda data: build_controls(json.loads(data)))
+    _peak("StructureParser (64 KiB chunks)", body, _stream)
+
+
+if __name__ == "__main__":
+    main()
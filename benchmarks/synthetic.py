@@ -0,0 +1,63 @@
+"""Synthetic LoxAPP3.json structures for benchmarks."""
+
+from __future__ import annotations
+
+import json
+import uuid as uuidlib
+from typing import Any, Dict
+
+_CONTROL_TYPES = ("Switch", "Dimmer", "Jalousie", "InfoOnlyAnalog", "IRoomControllerV2")
+
+
+def _uuid(rng_id: int) -> str:
+    raw = uuidlib.UUID(int=rng_id * 0x9E3779B97F4A7C15 % (1 << 128)).hex
+    return f"{raw[:8]}-{raw[8:12]}-{raw[12:16]}-{raw[16:]}"
+
+
+def make_structure(controls: int = 3000, rooms: int = 40, cats: int = 12) -> Dict[str, Any]:
+    """Build a structure dict shaped like LoxAPP3.json with LightControllerV2 subcontrols."""
+    counter = iter(range(1, 1 << 62))
+    room_ids = [_uuid(next(counter)) for _ in range(rooms)]
+    cat_ids = [_uuid(next(counter)) for _ in range(cats)]
+
+    structure: Dict[str, Any] = {
+        "lastModified": "2024-05-01 12:00:00",
+        "msInfo": {"serialNr": "504F94000000", "msName": "Bench", "projectName": "Bench"},
+        "rooms": {rid: {"uuid": rid, "name": f"Room {i}", "image": "x.svg"} for i, rid in enumerate(room_ids)},
+        "cats": {cid: {"uuid": cid, "name": f"Category {i}", "type": "lights"} for i, cid in enumerate(cat_ids)},
+        "controls": {},
+    }
+
+    for i in range(controls):
+        cid = _uuid(next(counter))
+        ctype = "LightControllerV2" if i % 10 == 0 else _CONTROL_TYPES[i % len(_CONTROL_TYPES)]
+        control: Dict[str, Any] = {
+            "name": f"Control {i}",
+            "type": ctype,
+            "uuidAction": cid,
+            "room": room_ids[i % rooms],
+            "cat": cat_ids[i % cats],
+            "defaultRating": 0,
+            "isFavorite": False,
+            "isSecured": False,
+            "details": {"format": "%.1f", "jLockable": True, "movementScene": i % 3},
+            "states": {name: _uuid(next(counter)) for name in ("active", "position", "value", "error")},
+        }
+        if ctype == "LightControllerV2":
+            control["subControls"] = {
+                f"{cid}/AI{n}": {
+                    "name": f"Output {n}",
+                    "type": "Dimmer" if n % 2 else "ColorPickerV2",
+                    "uuidAction": f"{cid}/AI{n}",
+                    "details": {"min": 0, "max": 100, "step": 1},
+                    "states": {"position": _uuid(next(counter)), "color": _uuid(next(counter))},
+                }
+                for n in range(1, 7)
+            }
+        structure["controls"][cid] = control
+
+    return structure
+
+
+def make_structure_bytes(controls: int = 3000) -> bytes:
+    return json.dumps(make_structure(controls), indent=1).encode("utf-8")
@@ -6,13 +6,27 @@ import logging
 
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
-from homeassistant.core import HomeAssistant
-from homeassistant.exceptions import ConfigEntryNotReady
-
-from loxone_api import DEFAULT_PORT, DEFAULT_TLS_PORT, LoxoneClient
-
-from .const import CONF_USE_TLS, CONF_VERIFY_SSL, DOMAIN, PLATFORMS
+from homeassistant.core import HomeAssistant, ServiceCall
+from homeassistant.exceptions import ConfigEntryAuthFailed, ConfigEntryNotReady
+from homeassistant.helpers.storage import STORAGE_DIR
+from homeassistant.util.ssl import get_default_context, get_default_no_verify_context
+
+from loxone_api import DEFAULT_PORT, DEFAULT_TLS_PORT, LoxoneClient, StructureCache
+from loxone_api.client import LoxoneAuthError
+
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_COMMAND_REFRESH,
+    CONF_USE_TLS,
+    CONF_VERIFY_SSL,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_COMMAND_REFRESH,
+    DOMAIN,
+    PLATFORMS,
+    SERVICE_REFRESH_STRUCTURE,
+)
 from .coordinator import LoxoneCoordinator
+from .token_store import LoxoneTokenStore
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -21,6 +35,12 @@ async def async_setup(hass: HomeAssistant, config) -> bool:
     """Set up the integration via YAML (not supported)."""
     _LOGGER.debug("async_setup")
 
+    async def refresh_structure(call: ServiceCall) -> None:
+        """Pick up Loxone Config changes without reloading the entries."""
+        for coordinator in list(hass.data.get(DOMAIN, {}).values()):
+            await coordinator.async_refresh_structure()
+
+    hass.services.async_register(DOMAIN, SERVICE_REFRESH_STRUCTURE, refresh_structure)
     return True
 
 
@@ -46,26 +66,47 @@ async def async_setup_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
 
     port = entry.data.get(CONF_PORT) or (DEFAULT_TLS_PORT if use_tls else DEFAULT_PORT)
 
+    verify_tls = entry.data.get(CONF_VERIFY_SSL, True)
     client = LoxoneClient(
         host=entry.data[CONF_HOST],
         user=entry.data[CONF_USERNAME],
         password=entry.data[CONF_PASSWORD],
         port=port,
-        verify_tls=entry.data.get(CONF_VERIFY_SSL, True),
+        verify_tls=verify_tls,
+        # Reuse Home Assistant's preloaded contexts instead of loading the CA bundle again
+        ssl_context=get_default_context() if verify_tls else get_default_no_verify_context(),
+        structure_cache=StructureCache(hass.config.path(STORAGE_DIR, DOMAIN)),
+        token_store=LoxoneTokenStore(hass, entry.entry_id),
     )
 
-    coordinator = LoxoneCoordinator(hass, client)
+    coordinator = LoxoneCoordinator(
+        hass,
+        client,
+        coalesce_window=entry.options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+        command_refresh=entry.options.get(CONF_COMMAND_REFRESH, DEFAULT_COMMAND_REFRESH),
+        entry_id=entry.entry_id,
+    )
     try:
         await coordinator.async_setup()
+    except LoxoneAuthError as err:
+        _LOGGER.error("Loxone Miniserver rejected the credentials: %s", err)
+        raise ConfigEntryAuthFailed(err) from err
     except Exception as err:
         _LOGGER.error("Unable to initialise Loxone client: %s", err)
         raise ConfigEntryNotReady from err
 
     hass.data[DOMAIN][entry.entry_id] = coordinator
+    # Options are read once by the coordinator; reload so changes take effect
+    entry.async_on_unload(entry.add_update_listener(_async_update_options))
     await hass.config_entries.async_forward_entry_setups(entry, PLATFORMS)
     return True
 
 
+async def _async_update_options(hass: HomeAssistant, entry: ConfigEntry) -> None:
+    """Reload the entry after its options were changed."""
+    await hass.config_entries.async_reload(entry.entry_id)
+
+
 async def async_unload_entry(hass: HomeAssistant, entry: ConfigEntry) -> bool:
     """Unload a Loxone config entry."""
     _LOGGER.debug("async_unload_entry")
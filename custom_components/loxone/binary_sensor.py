@@ -7,6 +7,8 @@ from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from loxone_api.structure import ControlIndex
+
 from .const import DOMAIN
 from .coordinator import LoxoneCoordinator
 from .entity import LoxoneEntity
@@ -16,12 +18,14 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator: LoxoneCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = [
+    coordinator.async_add_platform(_build_entities, async_add_entities)
+
+
+def _build_entities(coordinator: LoxoneCoordinator, index: ControlIndex) -> list[LoxoneBinarySensor]:
+    return [
         LoxoneBinarySensor(coordinator, control)
-        for control in coordinator.controls.values()
-        if control.type.lower() in {"contact", "binarysensor", "motion"}
+        for control in index.of_type("contact", "binarysensor", "motion")
     ]
-    async_add_entities(entities)
 
 
 class LoxoneBinarySensor(LoxoneEntity, BinarySensorEntity):
@@ -8,6 +8,8 @@ from homeassistant.const import ATTR_TEMPERATURE, UnitOfTemperature
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from loxone_api.structure import ControlIndex
+
 from .const import DOMAIN
 from .coordinator import LoxoneCoordinator
 from .entity import LoxoneEntity
@@ -17,12 +19,14 @@ async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator: LoxoneCoordinator = hass.data[DOMAIN][entry.entry_id]
-    entities = [
+    coordinator.async_add_platform(_build_entities, async_add_entities)
+
+
+def _build_entities(coordinator: LoxoneCoordinator, index: ControlIndex) -> list[LoxoneClimate]:
+    return [
         LoxoneClimate(coordinator, control)
-        for control in coordinator.controls.values()
-        if control.type.lower() in {"climate", "heating", "roomcontroller"}
+        for control in index.of_type("climate", "heating", "roomcontroller")
     ]
-    async_add_entities(entities)
 
 
 class LoxoneClimate(LoxoneEntity, ClimateEntity):
@@ -5,9 +5,23 @@ from __future__ import annotations
 import voluptuous as vol
 from homeassistant import config_entries
 from homeassistant.const import CONF_HOST, CONF_PASSWORD, CONF_PORT, CONF_USERNAME
+from homeassistant.core import callback
 from homeassistant.data_entry_flow import FlowResult
 
-from .const import CONF_USE_TLS, CONF_VERIFY_SSL, DEFAULT_TITLE, DOMAIN
+from .const import (
+    CONF_COALESCE_WINDOW,
+    CONF_COMMAND_REFRESH,
+    CONF_USE_TLS,
+    CONF_VERIFY_SSL,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_COMMAND_REFRESH,
+    DEFAULT_TITLE,
+    DOMAIN,
+    MAX_COALESCE_WINDOW,
+    REFRESH_ALWAYS,
+    REFRESH_AUTO,
+    REFRESH_RESPONSE,
+)
 
 
 class LoxoneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
@@ -15,6 +29,13 @@ class LoxoneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     VERSION = 1
 
+    @staticmethod
+    @callback
+    def async_get_options_flow(
+        config_entry: config_entries.ConfigEntry,
+    ) -> config_entries.OptionsFlow:
+        return LoxoneOptionsFlow()
+
     async def async_step_user(self, user_input=None) -> FlowResult:
         errors = {}
         if user_input is not None:
@@ -36,3 +57,43 @@ class LoxoneConfigFlow(config_entries.ConfigFlow, domain=DOMAIN):
 
     async def async_step_import(self, user_input) -> FlowResult:
         return await self.async_step_user(user_input)
+
+    async def async_step_reauth(self, entry_data) -> FlowResult:
+        """Started when the Miniserver rejects the stored credentials."""
+        return await self.async_step_reauth_confirm()
+
+    async def async_step_reauth_confirm(self, user_input=None) -> FlowResult:
+        entry = self._get_reauth_entry()
+        if user_input is not None:
+            return self.async_update_reload_and_abort(entry, data_updates=user_input)
+
+        data_schema = vol.Schema(
+            {
+                vol.Required(CONF_USERNAME, default=entry.data[CONF_USERNAME]): str,
+                vol.Required(CONF_PASSWORD): str,
+            }
+        )
+        return self.async_show_form(step_id="reauth_confirm", data_schema=data_schema)
+
+
+class LoxoneOptionsFlow(config_entries.OptionsFlow):
+    """Tune how state updates reach Home Assistant; the entry reloads on save."""
+
+    async def async_step_init(self, user_input=None) -> FlowResult:
+        if user_input is not None:
+            return self.async_create_entry(title="", data=user_input)
+
+        options = self.config_entry.options
+        data_schema = vol.Schema(
+            {
+                vol.Optional(
+                    CONF_COALESCE_WINDOW,
+                    default=options.get(CONF_COALESCE_WINDOW, DEFAULT_COALESCE_WINDOW),
+                ): vol.All(vol.Coerce(float), vol.Range(min=0, max=MAX_COALESCE_WINDOW)),
+                vol.Optional(
+                    CONF_COMMAND_REFRESH,
+                    default=options.get(CONF_COMMAND_REFRESH, DEFAULT_COMMAND_REFRESH),
+                ): vol.In([REFRESH_AUTO, REFRESH_RESPONSE, REFRESH_ALWAYS]),
+            }
+        )
+        return self.async_show_form(step_id="init", data_schema=data_schema)
@@ -8,6 +8,47 @@ CONF_USERNAME = "username"
 CONF_PASSWORD = "password"
 CONF_USE_TLS = "use_tls"
 CONF_VERIFY_SSL = "verify_ssl"
+CONF_COALESCE_WINDOW = "coalesce_window"
+CONF_COMMAND_REFRESH = "command_refresh"
+
+# Seconds to coalesce state updates before writing entity states (0 = one event-loop tick)
+DEFAULT_COALESCE_WINDOW = 0.0
+# Upper bound accepted by the options flow; longer windows make entities visibly lag
+MAX_COALESCE_WINDOW = 5.0
+
+# State refresh after a command:
+# - always: re-read the control with another request (one extra round trip per action)
+# - response: take the new value from the command's LL.value response
+# - auto: rely on the event stream when connected, otherwise behave like "response"
+#   and fall back to a refresh when the response carries no value
+REFRESH_ALWAYS = "always"
+REFRESH_RESPONSE = "response"
+REFRESH_AUTO = "auto"
+DEFAULT_COMMAND_REFRESH = REFRESH_AUTO
+
+# Commands sent in parallel by batch operations (Gen1 Miniservers serve at most 48 connections)
+COMMAND_CONCURRENCY = 4
+
+# Dispatcher signal for state updates of one control, formatted with the control uuid
+SIGNAL_STATE_UPDATE = f"{DOMAIN}_state_update_{{}}"
+# Dispatcher signal for availability changes of one coordinator's entities
+SIGNAL_AVAILABILITY = f"{DOMAIN}_availability_{{}}"
+
+# Last-known states persisted for warm starts, formatted with the config entry id
+STATES_STORAGE_KEY = f"{DOMAIN}.{{}}.states"
+STATES_STORAGE_VERSION = 1
+# Seconds to batch state snapshot writes
+STATES_SAVE_DELAY = 60
+
+# JWT persisted across restarts, formatted with the config entry id
+TOKEN_STORAGE_KEY = f"{DOMAIN}.{{}}.token"
+TOKEN_STORAGE_VERSION = 1
+
+# Seconds between background connection attempts after a warm start
+CONNECT_RETRY_INTERVAL = 30
+
+# Re-reads the structure file and updates only the entities of changed controls
+SERVICE_REFRESH_STRUCTURE = "refresh_structure"
 
 PLATFORMS = [
     "light",
@@ -17,3 +58,16 @@ PLATFORMS = [
     "climate",
     "scene",
 ]
+
+# Control detail keys read by the platforms; other details are not kept in memory
+DETAIL_KEYS = frozenset({"defaultSetpoint"})
+
+# State names, in order of preference, whose value is exposed as a control's state
+PRIMARY_STATES = (
+    "active",
+    "position",
+    "value",
+    "color",
+    "tempActual",
+    "activeMoods",
+)
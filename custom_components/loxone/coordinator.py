@@ -2,74 +2,361 @@
 
 from __future__ import annotations
 
+import asyncio
 import logging
-from typing import Any, Dict
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Tuple, Union
 
 from homeassistant.core import HomeAssistant, callback
+from homeassistant.helpers import entity_registry as er
 from homeassistant.helpers.dispatcher import async_dispatcher_send
+from homeassistant.helpers.entity import Entity
+from homeassistant.helpers.entity_platform import AddEntitiesCallback
+from homeassistant.helpers.storage import Store
 
 from loxone_api import LoxoneClient, LoxoneControl, LoxoneState
-
-from .const import DOMAIN
+from loxone_api.client import LoxoneAuthError
+from loxone_api.events import uuid_to_bytes
+from loxone_api.structure import ControlIndex, ControlsDiff, ParsedStructure, diff_controls
+
+from .const import (
+    COMMAND_CONCURRENCY,
+    CONNECT_RETRY_INTERVAL,
+    DEFAULT_COALESCE_WINDOW,
+    DEFAULT_COMMAND_REFRESH,
+    DETAIL_KEYS,
+    DOMAIN,
+    PRIMARY_STATES,
+    REFRESH_ALWAYS,
+    REFRESH_AUTO,
+    REFRESH_RESPONSE,
+    SIGNAL_AVAILABILITY,
+    SIGNAL_STATE_UPDATE,
+    STATES_SAVE_DELAY,
+    STATES_STORAGE_KEY,
+    STATES_STORAGE_VERSION,
+)
 
 _LOGGER = logging.getLogger(__name__)
 
+# Builds a platform's entities, querying the controls it needs from the index
+EntityFactory = Callable[["LoxoneCoordinator", ControlIndex], List[Entity]]
+
+
+@dataclass
+class _PlatformEntities:
+    """Entities a platform created, kept to add/remove them on structure refreshes."""
+
+    factory: EntityFactory
+    add_entities: AddEntitiesCallback
+    entities: Dict[str, Entity] = field(default_factory=dict)
+
 
 class LoxoneCoordinator:
     """Manage Loxone client lifecycle and state updates."""
 
-    def __init__(self, hass: HomeAssistant, client: LoxoneClient) -> None:
+    def __init__(
+        self,
+        hass: HomeAssistant,
+        client: LoxoneClient,
+        coalesce_window: float = DEFAULT_COALESCE_WINDOW,
+        command_refresh: str = DEFAULT_COMMAND_REFRESH,
+        entry_id: str | None = None,
+    ) -> None:
         self.hass = hass
         self.client = client
+        # How a control's state is updated after a command, see REFRESH_* in const
+        self.command_refresh = command_refresh
+        # Seconds to collect updates before notifying entities (0 = once per loop iteration)
+        self.coalesce_window = coalesce_window
         self.controls: Dict[str, Any] = {}
+        # Type, parent -> children and name-group lookups over self.controls
+        self.index = ControlIndex({})
+        # Control uuid -> precomputed /jdev/sps/io/<action uuid> path for commands and reads
+        self._routes: Dict[str, str] = {}
         self.states: Dict[str, Any] = {}
+        # Every named state pushed over the event stream, per control
+        self.control_states: Dict[str, Dict[str, Any]] = {}
+        # State UUID (string and 16-byte binary form) -> (control uuid, state name)
+        self._state_index: Dict[Union[str, bytes], Tuple[str, str]] = {}
+        # Control uuid -> name of the state exposed as the control's value
+        self._primary_states: Dict[str, str] = {}
+
+        # Latest pending update per control, flushed to entities in one go
+        self._pending_updates: Dict[str, LoxoneState] = {}
+        self._flush_handle: asyncio.Handle | None = None
+        self.updates_received = 0
+        self.updates_dispatched = 0
+
+        # Last-known states, restored on a warm start before the Miniserver answers
+        self._store: Store | None = (
+            Store(hass, STATES_STORAGE_VERSION, STATES_STORAGE_KEY.format(entry_id))
+            if entry_id
+            else None
+        )
+        self._save_scheduled = False
+        self._connect_task: asyncio.Task | None = None
+        self.entry_id = entry_id
+        # False until the first successful connect and while the event stream is down
+        self.available = False
+        # Dispatcher signal telling this coordinator's entities that availability changed
+        self.availability_signal = SIGNAL_AVAILABILITY.format(entry_id or id(self))
+
+        self._platforms: List[_PlatformEntities] = []
+        # Seconds per phase of the last structure load (client phases plus "index")
+        self.structure_timings: Dict[str, float] = {}
 
     async def async_setup(self) -> None:
-        """Initialise client and register callbacks."""
+        """
+        Initialise client and register callbacks.
+
+        With a cached structure file the controls and last-known states are set up
+        right away and the Miniserver is connected in the background; otherwise
+        this waits for authentication and the structure download.
+        """
         _LOGGER.debug("async_setup")
 
         await self.client.__aenter__()
         _LOGGER.debug("Client session initialized")
-        
-        token = await self.client.authenticate()
+
+        parsed = await self.client.load_cached_controls(DETAIL_KEYS)
+        if parsed is None:
+            await self._async_connect()
+            return
+
+        await self._async_apply_controls(await self._use_structure(parsed))
+        await self._restore_states()
+        _LOGGER.debug("Warm start with %d cached controls", len(self.controls))
+        self._connect_task = self.hass.async_create_background_task(
+            self._async_connect_loop(), f"{DOMAIN} connect {self.client.host}"
+        )
+
+    async def _async_connect(self) -> None:
+        """Authenticate, reconcile the controls and start the event stream."""
+        # Reuses the token persisted by the last run when the Miniserver still accepts it
+        token = await self.client.ensure_token()
         _LOGGER.debug("Authentication successful, JWT: %s...", token[:24] if len(token) > 24 else token)
         _LOGGER.debug("Client JWT property: %s", self.client.jwt[:24] if self.client.jwt and len(self.client.jwt) > 24 else self.client.jwt)
-        
-        self.controls = await self._load_controls()
+
+        controls = await self._load_controls()
+        # Keep the cached controls if the structure could not be fetched
+        if controls or not self.controls:
+            await self._async_apply_controls(controls)
+
+        # Push state updates over the websocket instead of polling each control;
+        # the initial full state table reconciles any restored values
+        await self.client.start_event_stream(
+            self._handle_state,
+            state_index=self._state_index,
+            connection_callback=self._set_available,
+        )
+        # Extend the JWT before it expires instead of authenticating from scratch
+        self.client.start_token_refresh()
+        self._set_available(True)
+
+    async def async_refresh_structure(self) -> ControlsDiff:
+        """
+        Re-read the structure file and add, replace or remove only the entities
+        of controls that changed, keeping every other entity in place.
+        """
+        _LOGGER.debug("async_refresh_structure")
+
+        parsed = await self.client.load_controls(DETAIL_KEYS)
+        diff = await self._async_apply_controls(await self._use_structure(parsed))
+        _LOGGER.debug(
+            "Structure refreshed: %d added, %d removed, %d changed controls",
+            len(diff.added),
+            len(diff.removed),
+            len(diff.changed),
+        )
+        if diff.added or diff.changed:
+            # The Miniserver only sends changes after its initial dump; reconnect
+            # so the new states are included in a fresh one
+            await self.client.restart_event_stream()
+        return diff
+
+    async def _async_apply_controls(self, controls: Dict[str, LoxoneControl]) -> ControlsDiff:
+        """Replace the control map and sync the platforms' entities with it."""
+        diff = diff_controls(self.controls, controls)
+        self.index, self._routes = await self.hass.async_add_executor_job(
+            self._build_lookups, controls
+        )
+        self.controls = controls
+        if not diff:
+            return diff
+
+        for control_uuid in diff.removed:
+            self.states.pop(control_uuid, None)
+            self.control_states.pop(control_uuid, None)
+        stale = set(diff.removed) | set(diff.changed)
+        for platform in self._platforms:
+            await self._async_sync_platform(platform, stale)
+        return diff
+
+    @callback
+    def async_add_platform(
+        self, factory: EntityFactory, async_add_entities: AddEntitiesCallback
+    ) -> None:
+        """Add a platform's entities; later structure refreshes reuse its factory."""
+        platform = _PlatformEntities(factory, async_add_entities)
+        self._platforms.append(platform)
+        entities = factory(self, self.index)
+        platform.entities = {entity.unique_id: entity for entity in entities}
+        async_add_entities(entities)
+
+    async def _async_sync_platform(self, platform: _PlatformEntities, stale: set[str]) -> None:
+        """Diff a platform's entities against what its factory builds now."""
+        wanted = {entity.unique_id: entity for entity in platform.factory(self, self.index)}
+        registry = er.async_get(self.hass)
+
+        for unique_id, entity in list(platform.entities.items()):
+            uuids = entity.state_uuids()
+            new = wanted.get(unique_id)
+            if new is not None and new.state_uuids() == uuids and stale.isdisjoint(uuids):
+                continue
+            del platform.entities[unique_id]
+            if new is None and entity.registry_entry is not None:
+                # Gone from the project: drop the registry entry too
+                registry.async_remove(entity.entity_id)
+            else:
+                # Recreated below under the same unique id, so history continues
+                await entity.async_remove(force_remove=True)
+
+        added = [entity for unique_id, entity in wanted.items() if unique_id not in platform.entities]
+        platform.entities.update((entity.unique_id, entity) for entity in added)
+        if added:
+            platform.add_entities(added)
+
+    @callback
+    def _set_available(self, available: bool) -> None:
+        """Record whether the Miniserver is reachable and tell the entities if that changed."""
+        if available == self.available:
+            return
+        self.available = available
+        async_dispatcher_send(self.hass, self.availability_signal)
+
+    async def _async_connect_loop(self) -> None:
+        """
+        Connect in the background, retrying until the Miniserver answers. Rejected
+        credentials are not retried; Home Assistant asks the user for new ones.
+        """
+        while True:
+            try:
+                await self._async_connect()
+                return
+            except asyncio.CancelledError:
+                raise
+            except LoxoneAuthError as err:
+                _LOGGER.error("Loxone Miniserver rejected the credentials: %s", err)
+                entry = self.hass.config_entries.async_get_entry(self.entry_id or "")
+                if entry is not None:
+                    entry.async_start_reauth(self.hass)
+                return
+            except Exception as err:
+                _LOGGER.warning(
+                    "Unable to connect to Loxone Miniserver, retrying in %ss: %s",
+                    CONNECT_RETRY_INTERVAL,
+                    err,
+                )
+            await asyncio.sleep(CONNECT_RETRY_INTERVAL)
 
     async def async_unload(self) -> None:
         """Close the client connection."""
         _LOGGER.debug("async_unload")
 
+        task, self._connect_task = self._connect_task, None
+        if task:
+            # Wait for it to stop so it cannot reopen the session closed below
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+        await self.client.stop_event_stream()
         await self.client.__aexit__(None, None, None)
+        self.available = False
+        self._platforms.clear()
+
+        if self._store is not None:
+            await self._store.async_save(self._states_snapshot())
+
+        if self._flush_handle:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        _LOGGER.debug(
+            "Coalesced %d of %d state updates", self.updates_coalesced, self.updates_received
+        )
 
     async def async_send_command(
-        self, control_uuid: str, command: str, value: Any | None = None
+        self,
+        control_uuid: str,
+        command: str,
+        value: Any | None = None,
+        *,
+        refresh: bool = True,
     ) -> None:
         """Send a control command using the jdev endpoint."""
         _LOGGER.debug("async_send_command")
 
-        ctrl: LoxoneControl | None = self.controls.get(control_uuid)
-        details = ctrl.details if ctrl else {}
+        settled = await self._async_send(control_uuid, command, value)
+        if not refresh or settled:
+            return
 
-        # Resolve action path robustly to avoid parent duplication
-        parent_uuid = details.get("parent_uuid")
-        subcontrol_id = details.get("subcontrol_id")
-        if parent_uuid and subcontrol_id:
-            action_uuid = f"{parent_uuid}/{subcontrol_id}"
-        elif "/" in control_uuid:
-            # Already composite; trust the provided path
-            action_uuid = control_uuid
-        else:
-            action_uuid = (ctrl.states.get("uuidAction") if ctrl else None) or control_uuid
+        # Fetch updated state immediately after command
+        try:
+            await self.async_update_state(control_uuid)
+        except Exception as err:
+            _LOGGER.warning("Failed to fetch updated state for %s: %s", control_uuid, err)
 
+    async def async_send_commands(
+        self,
+        commands: Iterable[Tuple[str, str, Any | None]],
+        max_concurrency: int = COMMAND_CONCURRENCY,
+    ) -> None:
+        """
+        Send several (control_uuid, command, value) commands concurrently, then
+        refresh each affected control once if needed. Raises the first failure
+        after all commands have been attempted.
+        """
+        _LOGGER.debug("async_send_commands")
+
+        commands = list(commands)
+        semaphore = asyncio.Semaphore(max_concurrency)
+
+        async def send(control_uuid: str, command: str, value: Any | None) -> bool:
+            async with semaphore:
+                return await self._async_send(control_uuid, command, value)
+
+        async def refresh(control_uuid: str) -> None:
+            async with semaphore:
+                await self.async_update_state(control_uuid)
+
+        results = await asyncio.gather(
+            *(send(*cmd) for cmd in commands), return_exceptions=True
+        )
+        stale = dict.fromkeys(cmd[0] for cmd, settled in zip(commands, results) if settled is False)
+        await asyncio.gather(*(refresh(uuid) for uuid in stale))
+
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+
+    async def _async_send(self, control_uuid: str, command: str, value: Any | None) -> bool:
+        """
+        Send one command. Returns True when the control's new state is already
+        known (pushed by the event stream or taken from the response), i.e. no
+        follow-up refresh is needed.
+        """
+        route = self._route(control_uuid)
         if value is None:
-            path = f"sps/io/{action_uuid}/{command}"
+            path = f"{route}/{command}"
         else:
-            path = f"sps/io/{action_uuid}/{command}/{value}"
+            path = f"{route}/{command}/{value}"
+
+        _LOGGER.debug("Sending command to %s (resolved %s): %s/%s (value=%s)", control_uuid, route, command, value, value)
 
-        _LOGGER.debug("Sending command to %s (resolved %s): %s/%s (value=%s)", control_uuid, action_uuid, command, value, value)
-        
         try:
             payload = await self.client.jdev_get(path)
             _LOGGER.debug("Command response: %s", payload)
@@ -82,35 +369,34 @@ class LoxoneCoordinator:
                     "Command %s/%s failed with code %s: %s",
                     command, value, ll_code, payload
                 )
+                return False
         except Exception as err:
             _LOGGER.error("Failed to send command %s/%s: %s", command, value, err)
             raise
-        
-        # Fetch updated state immediately after command
-        try:
-            await self.async_update_state(control_uuid)
-        except Exception as err:
-            _LOGGER.warning("Failed to fetch updated state for %s: %s", control_uuid, err)
+
+        if self.command_refresh == REFRESH_ALWAYS:
+            return False
+        if (
+            self.command_refresh == REFRESH_AUTO
+            and self.client.events_connected
+            and control_uuid in self._primary_states
+        ):
+            # The event stream pushes the new state; no need to ask for it
+            return True
+
+        # sps/io commands answer with the control's new value
+        response_value = ll.get("value")
+        if response_value is None or response_value == "":
+            return self.command_refresh == REFRESH_RESPONSE
+        self._store_state(control_uuid, response_value)
+        return True
 
     async def async_update_state(self, control_uuid: str) -> Any:
         """Fetch and cache the current state for a control."""
         _LOGGER.debug("async_update_state")
 
-        ctrl: LoxoneControl | None = self.controls.get(control_uuid)
-        details = ctrl.details if ctrl else {}
-
-        # Resolve read path robustly to avoid parent duplication
-        parent_uuid = details.get("parent_uuid")
-        subcontrol_id = details.get("subcontrol_id")
-        if parent_uuid and subcontrol_id:
-            read_uuid = f"{parent_uuid}/{subcontrol_id}"
-        elif "/" in control_uuid:
-            read_uuid = control_uuid
-        else:
-            read_uuid = (ctrl.states.get("uuidAction") if ctrl else None) or control_uuid
-
         try:
-            payload = await self.client.jdev_get(f"sps/io/{read_uuid}")
+            payload = await self.client.jdev_get(self._route(control_uuid))
         except Exception as err:
             _LOGGER.warning(
                 "Unable to refresh state for control %s: %s", control_uuid, err
@@ -118,23 +404,154 @@ class LoxoneCoordinator:
             return self.states.get(control_uuid)
 
         value = payload.get("LL", {}).get("value", payload)
-        self.states[control_uuid] = value
-        
-        # Notify Home Assistant that state has changed
-        async_dispatcher_send(
-            self.hass,
-            f"{DOMAIN}_state_update",
-            LoxoneState(control_uuid=control_uuid, state="", value=value)
-        )
-        
+        self._store_state(control_uuid, value)
         return value
 
+    def _route(self, control_uuid: str) -> str:
+        """The /jdev/sps/io/... path commands and reads for a control go to."""
+        route = self._routes.get(control_uuid)
+        if route is None:
+            route = self._resolve_route(control_uuid, self.controls.get(control_uuid))
+        return route
+
+    @staticmethod
+    def _resolve_route(control_uuid: str, ctrl: LoxoneControl | None) -> str:
+        # Resolve the io path robustly to avoid parent duplication
+        if ctrl and ctrl.parent_uuid and ctrl.subcontrol_id:
+            target = f"{ctrl.parent_uuid}/{ctrl.subcontrol_id}"
+        elif "/" in control_uuid:
+            # Already composite; trust the provided path
+            target = control_uuid
+        else:
+            target = (ctrl.states.get("uuidAction") if ctrl else None) or control_uuid
+        return f"/jdev/sps/io/{target}"
+
+    @classmethod
+    def _build_lookups(
+        cls, controls: Dict[str, LoxoneControl]
+    ) -> Tuple[ControlIndex, Dict[str, str]]:
+        """Control index and route table for a control map (run in the executor)."""
+        routes = {uuid: cls._resolve_route(uuid, ctrl) for uuid, ctrl in controls.items()}
+        return ControlIndex(controls), routes
+
+    @callback
+    def _store_state(self, control_uuid: str, value: Any) -> None:
+        """Cache a control's value and notify Home Assistant that it changed."""
+        self.states[control_uuid] = value
+        self._queue_update(LoxoneState(control_uuid=control_uuid, state="", value=value))
+
     @callback
     def _handle_state(self, state: LoxoneState) -> None:
         """Handle updates coming from the websocket."""
 
+        if not state.control_uuid:
+            # Unresolved events only carry the state UUID
+            owner = self._state_index.get(state.state)
+            if owner is None:
+                return
+            state = LoxoneState(control_uuid=owner[0], state=owner[1], value=state.value)
+
+        if state.state:
+            self.control_states.setdefault(state.control_uuid, {})[state.state] = state.value
+            if self._primary_states.get(state.control_uuid) != state.state:
+                return
+
         self.states[state.control_uuid] = state.value
-        async_dispatcher_send(self.hass, f"{DOMAIN}_state_update", state)
+        self._queue_update(state)
+
+    @property
+    def updates_coalesced(self) -> int:
+        """Number of entity notifications saved by coalescing."""
+        return self.updates_received - self.updates_dispatched - len(self._pending_updates)
+
+    @callback
+    def _queue_update(self, state: LoxoneState) -> None:
+        """Collect an update; bursts for one control result in a single notification."""
+        self.updates_received += 1
+        self._pending_updates[state.control_uuid] = state
+        if self._flush_handle is not None:
+            return
+        if self.coalesce_window > 0:
+            self._flush_handle = self.hass.loop.call_later(self.coalesce_window, self._flush_updates)
+        else:
+            self._flush_handle = self.hass.loop.call_soon(self._flush_updates)
+
+    @callback
+    def _flush_updates(self) -> None:
+        """Notify the entities of every control updated since the last flush."""
+        self._flush_handle = None
+        pending, self._pending_updates = self._pending_updates, {}
+        self.updates_dispatched += len(pending)
+        for control_uuid, state in pending.items():
+            async_dispatcher_send(self.hass, SIGNAL_STATE_UPDATE.format(control_uuid), state)
+        self._schedule_save()
+
+    @callback
+    def _schedule_save(self) -> None:
+        """Persist the states snapshot after STATES_SAVE_DELAY, once per delay."""
+        if self._store is None or self._save_scheduled:
+            return
+        self._save_scheduled = True
+        self._store.async_delay_save(self._states_snapshot, STATES_SAVE_DELAY)
+
+    @callback
+    def _states_snapshot(self) -> Dict[str, Any]:
+        self._save_scheduled = False
+        return {"states": self.states, "control_states": self.control_states}
+
+    async def _restore_states(self) -> None:
+        """Restore the last persisted states of controls that still exist."""
+        if self._store is None:
+            return
+        data = await self._store.async_load()
+        if not isinstance(data, dict):
+            return
+        for key, target in (("states", self.states), ("control_states", self.control_states)):
+            saved = data.get(key) or {}
+            target.update({uuid: value for uuid, value in saved.items() if uuid in self.controls})
+
+    async def _index_states(self, controls: Dict[str, LoxoneControl]) -> None:
+        """Build the state UUID -> (control, state name) routing index."""
+        # Thousands of uuid conversions: done in the executor, not on the event loop
+        index, primary_states = await self.hass.async_add_executor_job(
+            self._build_state_index, controls
+        )
+        # Swapped in place: the client holds a reference for routing events
+        self._state_index.clear()
+        self._state_index.update(index)
+        self._primary_states.clear()
+        self._primary_states.update(primary_states)
+
+    @classmethod
+    def _build_state_index(
+        cls, controls: Dict[str, LoxoneControl]
+    ) -> Tuple[Dict[Union[str, bytes], Tuple[str, str]], Dict[str, str]]:
+        index: Dict[Union[str, bytes], Tuple[str, str]] = {}
+        primary_states: Dict[str, str] = {}
+        for ctrl in controls.values():
+            primary = cls._primary_state(ctrl)
+            if primary:
+                primary_states[ctrl.uuid] = primary
+            for name, state_uuid in ctrl.states.items():
+                if not isinstance(state_uuid, str):
+                    continue
+                owner = (ctrl.uuid, name)
+                index[state_uuid] = owner
+                try:
+                    index[uuid_to_bytes(state_uuid)] = owner
+                except ValueError:
+                    _LOGGER.debug("Skipping malformed state UUID %s of %s", state_uuid, ctrl.uuid)
+        return index, primary_states
+
+    @staticmethod
+    def _primary_state(ctrl: LoxoneControl) -> str | None:
+        """Return the state that represents the control's main value."""
+        for name in PRIMARY_STATES:
+            if name in ctrl.states:
+                return name
+        if len(ctrl.states) == 1:
+            return next(iter(ctrl.states))
+        return None
 
     def get_state(self, uuid: str) -> Any:
         """Return cached value for a control."""
@@ -146,84 +563,34 @@ class LoxoneCoordinator:
         _LOGGER.debug("_load_controls")
 
         try:
-            structure = await self.client.load_structure()
+            # Streamed: controls are built entry by entry instead of from a full JSON tree
+            parsed = await self.client.load_controls(DETAIL_KEYS)
         except Exception as err:
             _LOGGER.error("Unable to fetch Loxone structure: %s", err)
             return {}
 
-        rooms = {
-            room_uuid: room_data.get("name")
-            for room_uuid, room_data in (structure.get("rooms") or {}).items()
-        }
-        
-        # Pre-create Home Assistant areas for each Loxone room
-        await self._create_areas(list(rooms.values()))
-        
-        categories = {
-            cat_uuid: cat_data.get("name")
-            for cat_uuid, cat_data in (structure.get("cats") or {}).items()
-        }
-
-        controls: Dict[str, LoxoneControl] = {}
-        for control_uuid, control in (structure.get("controls") or {}).items():
-            if not isinstance(control, dict):
-                continue
-
-            # Parent/top-level control
-            parent = LoxoneControl(
-                uuid=control_uuid,
-                name=control.get("name") or control_uuid,
-                type=control.get("type") or "",
-                room=rooms.get(control.get("room")),
-                category=categories.get(control.get("cat")),
-                states=control.get("states") or {},
-                details=control.get("details") or {},
-            )
-            controls[control_uuid] = parent
-
-            # Subcontrols (e.g., LightControllerV2 outputs, moods, etc.)
-            sub_controls = control.get("subControls") or {}
-            # Handle dict keyed by UUID or list of subcontrol dicts
-            if isinstance(sub_controls, dict):
-                iterable = sub_controls.items()
-            elif isinstance(sub_controls, list):
-                # Convert list to (uuid, data) pairs when possible
-                iterable = (
-                    (
-                        sc.get("uuid") or sc.get("id") or sc.get("UUID") or "",
-                        sc,
-                    )
-                    for sc in sub_controls
-                    if isinstance(sc, dict)
-                )
-            else:
-                iterable = []
+        return await self._use_structure(parsed)
 
-            for sc_uuid, sc_data in iterable:
-                if not sc_uuid or not isinstance(sc_data, dict):
-                    continue
-                name = sc_data.get("name") or sc_uuid
-                # Prefix with parent name for clarity
-                full_name = f"{parent.name} - {name}" if parent.name else name
-                # Store subcontrol with composite UUID (parent/subcontrol_id) for proper lookup
-                composite_uuid = f"{control_uuid}/{sc_uuid}"
-                subcontrol_id = sc_data.get("id") or sc_uuid
-                sc = LoxoneControl(
-                    uuid=composite_uuid,
-                    name=full_name,
-                    type=(sc_data.get("type") or sc_data.get("typeName") or ""),
-                    room=parent.room,
-                    category=parent.category,
-                    states=sc_data.get("states") or {},
-                    details={
-                        **(sc_data.get("details") or {}),
-                        "parent_uuid": control_uuid,
-                        "subcontrol_id": subcontrol_id,
-                    },
-                )
-                controls[composite_uuid] = sc
+    async def _use_structure(self, parsed: ParsedStructure) -> Dict[str, LoxoneControl]:
+        """Create areas for the structure's rooms and index its controls' states."""
+        rooms = parsed.sections.get("rooms") or {}
+        # Pre-create Home Assistant areas for each Loxone room
+        await self._create_areas(
+            [room.get("name") for room in rooms.values() if isinstance(room, dict)]
+        )
 
-        return controls
+        start = time.perf_counter()
+        await self._index_states(parsed.controls)
+        self.structure_timings = {
+            **self.client.structure_timings,
+            "index": time.perf_counter() - start,
+        }
+        _LOGGER.debug(
+            "Loaded %d controls (%s)",
+            len(parsed.controls),
+            ", ".join(f"{phase} {secs * 1000:.0f} ms" for phase, secs in self.structure_timings.items()),
+        )
+        return parsed.controls
 
     async def _create_areas(self, room_names: list) -> None:
         """Pre-create Home Assistant areas for Loxone rooms."""
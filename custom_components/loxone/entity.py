@@ -12,7 +12,7 @@ from homeassistant.helpers.entity import Entity
 
 from loxone_api import LoxoneControl, LoxoneState
 
-from .const import DOMAIN
+from .const import SIGNAL_STATE_UPDATE
 from .coordinator import LoxoneCoordinator
 
 _LOGGER = logging.getLogger(__name__)
@@ -26,7 +26,8 @@ class LoxoneEntity(Entity):
     def __init__(self, coordinator: LoxoneCoordinator, control: LoxoneControl) -> None:
         self.coordinator = coordinator
         self.control = control
-        self._unsub: Callable[[], None] | None = None
+        self._unsubs: list[Callable[[], None]] = []
+        self._write_scheduled = False
         self._attr_unique_id = control.uuid
         # Include room in entity name for clarity if available
         if control.room:
@@ -35,19 +36,41 @@ class LoxoneEntity(Entity):
             self._attr_name = control.name
 
     async def async_added_to_hass(self) -> None:
+        uuids = self.state_uuids()
+
+        @callback
+        def write_state() -> None:
+            self._write_scheduled = False
+            self.async_write_ha_state()
+
         @callback
         def handle_event(state: LoxoneState) -> None:
-            if state.control_uuid == self.control.uuid:
+            if len(uuids) == 1:
                 self.async_write_ha_state()
-
-        self._unsub = async_dispatcher_connect(
-            self.hass, f"{DOMAIN}_state_update", handle_event
+            elif not self._write_scheduled:
+                # Several controls may update in the same flush; write once after it
+                self._write_scheduled = True
+                self.hass.loop.call_soon(write_state)
+
+        # One signal per control, so an update only wakes the entities that show it
+        self._unsubs = [
+            async_dispatcher_connect(self.hass, SIGNAL_STATE_UPDATE.format(uuid), handle_event)
+            for uuid in uuids
+        ]
+        self._unsubs.append(
+            async_dispatcher_connect(
+                self.hass, self.coordinator.availability_signal, self.async_write_ha_state
+            )
         )
 
     async def async_will_remove_from_hass(self) -> None:
-        if self._unsub:
-            self._unsub()
-            self._unsub = None
+        for unsub in self._unsubs:
+            unsub()
+        self._unsubs = []
+
+    def state_uuids(self) -> list[str]:
+        """Control uuids whose state updates this entity renders."""
+        return [self.control.uuid]
 
     async def async_update(self) -> None:
         """Poll the latest state when websocket updates are unavailable."""
@@ -56,7 +79,8 @@ class LoxoneEntity(Entity):
 
     @property
     def available(self) -> bool:
-        return True
+        # Restored states are shown greyed out until the Miniserver is connected
+        return self.coordinator.available
 
     @property
     def extra_state_attributes(self) -> dict[str, Any]:
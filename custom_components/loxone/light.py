@@ -2,81 +2,75 @@
 
 from __future__ import annotations
 
+import colorsys
 import logging
+import re
 
 from homeassistant.components.light import ATTR_BRIGHTNESS, ATTR_RGB_COLOR, ColorMode, LightEntity
 from homeassistant.config_entries import ConfigEntry
 from homeassistant.core import HomeAssistant
 from homeassistant.helpers.entity_platform import AddEntitiesCallback
 
+from loxone_api.structure import ControlIndex
+
 from .const import DOMAIN
 from .entity import LoxoneEntity
 from .coordinator import LoxoneCoordinator
 
 _LOGGER = logging.getLogger(__name__)
 
+# Supported Loxone light device types
+LIGHT_TYPES = ("lightcontrollerv2", "colorpickerv2", "dimmer", "switch")
+
+_HSV_RE = re.compile(r"^hsv\(\s*([\d.]+)\s*,\s*([\d.]+)\s*,\s*([\d.]+)\s*\)$", re.IGNORECASE)
+
+
+def _parse_color(value) -> tuple[int, int, int] | None:
+    """Parse a ColorPickerV2 text state ("hsv(h,s,v)") or a legacy "RRGGBB" string."""
+    text = str(value).strip()
+    match = _HSV_RE.match(text)
+    if match:
+        h, s, v = (float(part) for part in match.groups())
+        r, g, b = colorsys.hsv_to_rgb(h / 360, s / 100, v / 100)
+        return (round(r * 255), round(g * 255), round(b * 255))
+    if len(text) == 6:
+        return (int(text[0:2], 16), int(text[2:4], 16), int(text[4:6], 16))
+    return None
+
 
 async def async_setup_entry(
     hass: HomeAssistant, entry: ConfigEntry, async_add_entities: AddEntitiesCallback
 ) -> None:
     coordinator: LoxoneCoordinator = hass.data[DOMAIN][entry.entry_id]
-    
-    # Supported Loxone light device types
-    light_types = {
-        "lightcontrollerv2",
-        "colorpickerv2",
-        "dimmer",
-        "switch",
-    }
-    
-    entities = []
+    coordinator.async_add_platform(_build_entities, async_add_entities)
 
-    # Group subcontrols under LightControllerV2 by parent and name to merge duplicates (e.g., Pendant)
-    parent_children: dict[str, list] = {}
-    for control in coordinator.controls.values():
-        details = control.details or {}
-        parent_uuid = details.get("parent_uuid")
-        if parent_uuid:
-            parent_children.setdefault(parent_uuid, []).append(control)
+
+def _build_entities(coordinator: LoxoneCoordinator, index: ControlIndex) -> list[LightEntity]:
+    entities = []
 
     # Keep track of subcontrols that are merged to avoid adding them individually
     merged_subcontrol_uuids: set[str] = set()
 
-    # Create grouped entities for LightControllerV2 parents
-    for parent in (c for c in coordinator.controls.values() if (c.type or "").lower() == "lightcontrollerv2"):
-        children = parent_children.get(parent.uuid, [])
-        if not children:
-            continue
-
-        # Group children by display name (after the parent prefix)
-        name_groups: dict[str, list] = {}
-        for child in children:
-            # Child names are in format "<parent> - <name>", extract the part after the hyphen
-            base_name = child.name
-            if parent.name and base_name.startswith(parent.name + " - "):
-                base_name = base_name[len(parent.name) + 3 :]
-            norm = base_name.strip().lower()
-            name_groups.setdefault(norm, []).append(child)
-
-        for norm_name, group in name_groups.items():
+    # Merge duplicate-named subcontrols of LightControllerV2 parents (e.g., Pendant)
+    for parent in index.of_type("lightcontrollerv2"):
+        for norm_name, group in index.name_groups(parent.uuid).items():
             if len(group) > 1:
                 # Merge duplicate-named subcontrols into a single grouped entity
                 _LOGGER.debug("Merging %d subcontrols under '%s' of parent %s", len(group), norm_name, parent.uuid)
-                entities.append(LoxoneGroupedLight(coordinator, parent, group))
+                entities.append(LoxoneGroupedLight(coordinator, parent, list(group)))
                 merged_subcontrol_uuids.update(c.uuid for c in group)
 
     # Add remaining lights (skip merged duplicates)
-    for control in coordinator.controls.values():
+    for control in index.of_type(*LIGHT_TYPES):
         if control.uuid in merged_subcontrol_uuids:
             continue
-        if control.type.lower() in light_types:
-            # Use color picker entity for ColorPickerV2, standard light for others
-            _LOGGER.debug("Adding Loxone light entity for control %s of type %s", control.uuid, control.type)
-            if control.type.lower() == "colorpickerv2":
-                entities.append(LoxoneColorLight(coordinator, control))
-            else:
-                entities.append(LoxoneLight(coordinator, control))
-    async_add_entities(entities)
+        # Use color picker entity for ColorPickerV2, standard light for others
+        _LOGGER.debug("Adding Loxone light entity for control %s of type %s", control.uuid, control.type)
+        if control.type.lower() == "colorpickerv2":
+            entities.append(LoxoneColorLight(coordinator, control))
+        else:
+            entities.append(LoxoneLight(coordinator, control))
+    return entities
 
 
 class LoxoneLight(LoxoneEntity, LightEntity):
@@ -141,13 +135,8 @@ class LoxoneColorLight(LoxoneLight):
             return None
         
         try:
-            # Loxone stores color as a hex string like "FF0000" for red
-            hex_color = str(value).strip()
-            if len(hex_color) == 6:
-                r = int(hex_color[0:2], 16)
-                g = int(hex_color[2:4], 16)
-                b = int(hex_color[4:6], 16)
-                return (r, g, b)
+            # The color text state looks like "hsv(0,100,100)" for red
+            return _parse_color(value)
         except (ValueError, TypeError, AttributeError):
             _LOGGER.debug("Failed to parse color value: %s", value)
         
@@ -206,6 +195,9 @@ class LoxoneGroupedLight(LoxoneEntity, LightEntity):
             self._attr_supported_color_modes = {ColorMode.ONOFF}
             self._attr_color_mode = ColorMode.ONOFF
 
+    def state_uuids(self) -> list[str]:
+        return [c.uuid for c in self.subcontrols]
+
     def _first_of_type(self, t: str):
         for c in self.subcontrols:
             if (c.type or "").lower() == t:
@@ -248,12 +240,7 @@ class LoxoneGroupedLight(LoxoneEntity, LightEntity):
         if value is None or value == "":
             return None
         try:
-            hex_color = str(value).strip()
-            if len(hex_color) == 6:
-                r = int(hex_color[0:2], 16)
-                g = int(hex_color[2:4], 16)
-                b = int(hex_color[4:6], 16)
-                return (r, g, b)
+            return _parse_color(value)
         except (ValueError, TypeError, AttributeError):
             _LOGGER.debug("Failed to parse grouped color value: %s", value)
         return None
@@ -266,24 +253,26 @@ class LoxoneGroupedLight(LoxoneEntity, LightEntity):
         # Apply color to all colorpickerv2 subcontrols
         if rgb is not None and ColorMode.RGB in getattr(self, "_attr_supported_color_modes", set()):
             hex_color = f"{rgb[0]:02X}{rgb[1]:02X}{rgb[2]:02X}"
-            for c in self.subcontrols:
-                if (c.type or "").lower() == "colorpickerv2":
-                    await self.coordinator.async_send_command(c.uuid, "setColor", hex_color)
+            await self.coordinator.async_send_commands(
+                (c.uuid, "setColor", hex_color)
+                for c in self.subcontrols
+                if (c.type or "").lower() == "colorpickerv2"
+            )
             return
 
         # Apply brightness to all dimmer subcontrols
         if brightness is not None and ColorMode.BRIGHTNESS in getattr(self, "_attr_supported_color_modes", set()):
             value = round(brightness / 2.55, 1)
-            for c in self.subcontrols:
-                if (c.type or "").lower() == "dimmer":
-                    await self.coordinator.async_send_command(c.uuid, "setValue", value)
+            await self.coordinator.async_send_commands(
+                (c.uuid, "setValue", value)
+                for c in self.subcontrols
+                if (c.type or "").lower() == "dimmer"
+            )
             return
 
         # Fallback: turn on all switch-like subcontrols
-        for c in self.subcontrols:
-            await self.coordinator.async_send_command(c.uuid, "on")
+        await self.coordinator.async_send_commands((c.uuid, "on", None) for c in self.subcontrols)
 
     async def async_turn_off(self, **kwargs) -> None:
         _LOGGER.debug("async_turn_off")
-        for c in self.subcontrols:
-            await self.coordinator.async_send_command(c.uuid, "off")
+        await self.coordinator.async_send_commands((c.uuid, "off", None) for c in self.subcontrols)
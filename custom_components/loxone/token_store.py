@@ -0,0 +1,35 @@
+"""Token store for the Loxone client backed by Home Assistant storage."""
+
+from __future__ import annotations
+
+from homeassistant.core import HomeAssistant
+from homeassistant.helpers.storage import Store
+
+from loxone_api import StoredToken, TokenStore
+
+from .const import TOKEN_STORAGE_KEY, TOKEN_STORAGE_VERSION
+
+
+class LoxoneTokenStore(TokenStore):
+    """Keeps one config entry's token in .storage, next to its other data."""
+
+    def __init__(self, hass: HomeAssistant, entry_id: str) -> None:
+        self._store: Store = Store(
+            hass, TOKEN_STORAGE_VERSION, TOKEN_STORAGE_KEY.format(entry_id), private=True
+        )
+
+    async def load(self, key: str) -> StoredToken | None:
+        data = await self._store.async_load()
+        # A changed host or user in the entry makes the old token useless
+        if not isinstance(data, dict) or data.get("key") != key:
+            return None
+        return StoredToken.from_dict(data.get("token"))
+
+    async def save(self, key: str, token: StoredToken) -> None:
+        await self._store.async_save({"key": key, "token": token.to_dict()})
+
+    async def clear(self, key: str) -> None:
+        data = await self._store.async_load()
+        # Only the token saved under key is forgotten, as with FileTokenStore
+        if isinstance(data, dict) and data.get("key") == key:
+            await self._store.async_remove()
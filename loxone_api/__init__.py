@@ -1,7 +1,19 @@
 """Async Loxone Miniserver client library."""
 
+from .cache import StructureCache
 from .client import LoxoneClient
 from .const import DEFAULT_PORT, DEFAULT_TLS_PORT
 from .models import LoxoneControl, LoxoneState
+from .tokens import FileTokenStore, StoredToken, TokenStore
 
-__all__ = ["LoxoneClient", "LoxoneControl", "LoxoneState", "DEFAULT_PORT", "DEFAULT_TLS_PORT"]
+__all__ = [
+    "LoxoneClient",
+    "LoxoneControl",
+    "LoxoneState",
+    "StructureCache",
+    "TokenStore",
+    "FileTokenStore",
+    "StoredToken",
+    "DEFAULT_PORT",
+    "DEFAULT_TLS_PORT",
+]
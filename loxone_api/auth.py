@@ -74,6 +74,92 @@ class JwtRequestParams:
         return JwtRequestParams(permission=self.permission, uuid=uid, info=self.info)
 
 
+class LoxoneCredentials:
+    """
+    A user and password for the getkey2/getjwt flow.
+
+    HASH("{password}:{userSalt}") only changes with the password (and so the
+    salt), so it is computed once per (salt, hashAlg) and reused by every
+    authentication with these credentials.
+    """
+
+    __slots__ = ("user", "_password", "_pw_hashes")
+
+    # A user's salt rarely changes; this only bounds the cache if it does
+    _MAX_HASHES = 4
+
+    def __init__(self, user: str, password: str) -> None:
+        self.user = user.strip()
+        self._password = password.rstrip("\r\n")
+        self._pw_hashes: Dict[Tuple[str, str], str] = {}
+
+    def matches(self, user: str, password: str) -> bool:
+        return self.user == user.strip() and self._password == password.rstrip("\r\n")
+
+    def pw_hash(self, salt: str, hash_alg: str) -> str:
+        """UPPER(HASH("{password}:{salt}")) with hash_alg, cached."""
+        key = (salt, hash_alg.upper())
+        pw_hash = self._pw_hashes.get(key)
+        if pw_hash is None:
+            pw_hash = _hash_hex(hash_alg, f"{self._password}:{salt}").upper()
+            if len(self._pw_hashes) >= self._MAX_HASHES:
+                self._pw_hashes.clear()
+            self._pw_hashes[key] = pw_hash
+        return pw_hash
+
+    def getjwt_path(
+        self, getkey2_value: Dict[str, Any], params: JwtRequestParams, debug: bool = False
+    ) -> Tuple[str, Dict[str, Any]]:
+        """
+        Build the getjwt path from the getkey2 value (see
+        build_getjwt_path_from_getkey2). The debug dict (which holds the password
+        hash) is only filled in with debug=True, otherwise it is empty; callers pass
+        whether the logger they would log it with is enabled for DEBUG.
+        """
+        key_hex = (getkey2_value.get("key") or "").strip()
+        salt = (getkey2_value.get("salt") or "").strip()
+        hash_alg = (getkey2_value.get("hashAlg") or "SHA1").strip()
+
+        if not key_hex or not salt:
+            raise ValueError(f"Invalid getkey2 value (missing key/salt): {getkey2_value}")
+
+        # pwHash = UPPER( HASH("{password}:{userSalt}") with hashAlg )
+        pw_hash = self.pw_hash(salt, hash_alg)
+
+        # hash = HMAC(hashAlg, key, "{user}:{pwHash}")
+        hmac_key_bytes, key_ascii_dbg = decode_getkey2_key_to_hmac_key_bytes(key_hex)
+        msg = f"{self.user}:{pw_hash}"
+        auth_hmac = _hmac_hex(hash_alg, hmac_key_bytes, msg)
+
+        p = params.with_defaults()
+        info_enc = quote(p.info, safe="")
+
+        path = f"/jdev/sys/getjwt/{auth_hmac}/{self.user}/{p.permission}/{p.uuid}/{info_enc}"
+
+        if not debug:
+            return path, {}
+
+        details = {
+            "user": self.user,
+            "permission": p.permission,
+            "uuid": p.uuid,
+            "info": p.info,
+            "info_enc": info_enc,
+            "hash_alg": hash_alg,
+            "salt": salt,
+            "pw_hash": pw_hash,
+            "pw_hash_len": len(pw_hash),
+            "key_hex": key_hex,
+            "key_ascii_dbg": key_ascii_dbg[:24] + ("..." if len(key_ascii_dbg) > 24 else ""),
+            "hmac_key_len": len(hmac_key_bytes),
+            "auth_hmac": auth_hmac,
+            "auth_hmac_len": len(auth_hmac),
+            "msg": msg,
+            "path": path,
+        }
+        return path, details
+
+
 def build_getjwt_path_from_getkey2(
     user: str,
     password: str,
@@ -87,46 +173,16 @@ def build_getjwt_path_from_getkey2(
       "salt": "...",
       "hashAlg": "SHA256"
     }
+
+    One-off helper; keep a LoxoneCredentials around to reuse the password hash.
     """
-    user_clean = user.strip()
-    password_clean = password.rstrip("\r\n")
-
-    key_hex = (getkey2_value.get("key") or "").strip()
-    salt = (getkey2_value.get("salt") or "").strip()
-    hash_alg = (getkey2_value.get("hashAlg") or "SHA1").strip()
-
-    if not key_hex or not salt:
-        raise ValueError(f"Invalid getkey2 value (missing key/salt): {getkey2_value}")
-
-    # pwHash = UPPER( HASH("{password}:{userSalt}") with hashAlg )
-    pw_hash = _hash_hex(hash_alg, f"{password_clean}:{salt}").upper()
-
-    # hash = HMAC(hashAlg, key, "{user}:{pwHash}")
-    hmac_key_bytes, key_ascii_dbg = decode_getkey2_key_to_hmac_key_bytes(key_hex)
-    msg = f"{user_clean}:{pw_hash}"
-    auth_hmac = _hmac_hex(hash_alg, hmac_key_bytes, msg)
-
-    p = params.with_defaults()
-    info_enc = quote(p.info, safe="")
-
-    path = f"/jdev/sys/getjwt/{auth_hmac}/{user_clean}/{p.permission}/{p.uuid}/{info_enc}"
-
-    debug = {
-        "user": user_clean,
-        "permission": p.permission,
-        "uuid": p.uuid,
-        "info": p.info,
-        "info_enc": info_enc,
-        "hash_alg": hash_alg,
-        "salt": salt,
-        "pw_hash": pw_hash,
-        "pw_hash_len": len(pw_hash),
-        "key_hex": key_hex,
-        "key_ascii_dbg": key_ascii_dbg[:24] + ("..." if len(key_ascii_dbg) > 24 else ""),
-        "hmac_key_len": len(hmac_key_bytes),
-        "auth_hmac": auth_hmac,
-        "auth_hmac_len": len(auth_hmac),
-        "msg": msg,
-        "path": path,
-    }
-    return path, debug
\ No newline at end of file
+    return LoxoneCredentials(user, password).getjwt_path(getkey2_value, params, debug=True)
+
+
+def build_token_hash(token: str, key_hex: str, hash_alg: str = "SHA1") -> str:
+    """
+    HMAC of the JWT with the key from jdev/sys/getkey, as used by
+    authwithtoken/refreshjwt/checktoken/killtoken.
+    """
+    hmac_key_bytes, _ = decode_getkey2_key_to_hmac_key_bytes(key_hex)
+    return _hmac_hex(hash_alg, hmac_key_bytes, token)
@@ -0,0 +1,112 @@
+"""
+Vectorised handling of large value-event tables (optional, requires numpy).
+
+The Miniserver resends the full value table on every (re)connect. Keeping the last
+table as numpy arrays lets a resync be diffed with one vector compare, so only
+values that actually changed are handed to callbacks.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from .events import VALUE_EVENT_LENGTH, Buffer, iter_value_events
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - numpy is an optional extra
+    np = None
+
+HAS_NUMPY = np is not None
+
+VALUE_EVENT_DTYPE = np.dtype([("uuid", "V16"), ("value", "<f8")]) if HAS_NUMPY else None
+
+# Tables smaller than this are diffed entry by entry; numpy setup costs more than it saves
+BULK_MIN_ENTRIES = 64
+
+
+class ValueSnapshot:
+    """Last known value of every value state, used to filter out unchanged events."""
+
+    def __init__(self, min_bulk_entries: int = BULK_MIN_ENTRIES) -> None:
+        if not HAS_NUMPY:
+            raise RuntimeError("ValueSnapshot requires numpy (pip install loxone-api[numpy])")
+        self.min_bulk_entries = min_bulk_entries
+        self._uuids: Optional["np.ndarray"] = None
+        self._values: Optional["np.ndarray"] = None
+        self._index: Dict[bytes, int] = {}
+        self._extra: Dict[bytes, float] = {}
+
+    def __len__(self) -> int:
+        return len(self._index) + len(self._extra)
+
+    def clear(self) -> None:
+        self._uuids = None
+        self._values = None
+        self._index = {}
+        self._extra = {}
+
+    def changes(self, payload: Buffer, full: bool = False) -> List[Tuple[bytes, float]]:
+        """
+        Apply a value-event table and return the (binary uuid, value) pairs that changed.
+
+        full marks the complete table sent after enablebinstatusupdate; only that one
+        replaces the snapshot layout. Other tables, however large, are merged into it.
+        """
+        count = len(payload) // VALUE_EVENT_LENGTH
+        if count >= self.min_bulk_entries:
+            table = np.frombuffer(payload, dtype=VALUE_EVENT_DTYPE, count=count)
+            if self._uuids is not None and np.array_equal(table["uuid"], self._uuids):
+                return self._diff_table(table)
+            if full:
+                return self._replace_table(table)
+        return list(self._apply_entries(payload))
+
+    def _diff_table(self, table: "np.ndarray") -> List[Tuple[bytes, float]]:
+        # Same layout as the last full table (the usual reconnect case): one vector compare
+        uuids = table["uuid"]
+        values = table["value"]
+        previous = self._values
+        changed = np.flatnonzero(
+            (values != previous) & ~(np.isnan(values) & np.isnan(previous))
+        )
+        self._values = values.copy()
+        return list(zip(uuids[changed].tolist(), values[changed].tolist()))
+
+    def _replace_table(self, table: "np.ndarray") -> List[Tuple[bytes, float]]:
+        uuids = table["uuid"]
+        values = table["value"]
+        # New layout: everything that differs from what we knew is a change
+        known = {**self._extra, **self._known_values()}
+        self._uuids = uuids.copy()
+        self._values = values.copy()
+        self._index = {uuid: pos for pos, uuid in enumerate(self._uuids.tolist())}
+        self._extra = {}
+        return [
+            (uuid, value)
+            for uuid, value in zip(self._uuids.tolist(), self._values.tolist())
+            if uuid not in known or not _same(known[uuid], value)
+        ]
+
+    def _apply_entries(self, payload: Buffer) -> Iterator[Tuple[bytes, float]]:
+        for uuid, value in iter_value_events(payload):
+            pos = self._index.get(uuid)
+            if pos is not None:
+                assert self._values is not None
+                if _same(self._values[pos], value):
+                    continue
+                self._values[pos] = value
+            else:
+                if uuid in self._extra and _same(self._extra[uuid], value):
+                    continue
+                self._extra[uuid] = value
+            yield uuid, value
+
+    def _known_values(self) -> Dict[bytes, float]:
+        if self._uuids is None or self._values is None:
+            return {}
+        return dict(zip(self._uuids.tolist(), self._values.tolist()))
+
+
+def _same(a: float, b: float) -> bool:
+    return a == b or (a != a and b != b)
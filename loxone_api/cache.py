@@ -0,0 +1,103 @@
+"""On-disk cache of the LoxAPP3.json structure file."""
+
+from __future__ import annotations
+
+import asyncio
+import gzip
+import json
+import logging
+import os
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .const import UNSAFE_FILENAME_CHARS
+
+log = logging.getLogger(__name__)
+
+
+class StructureCache:
+    """
+    Keeps the last structure file per Miniserver, tagged with its lastModified
+    version (as returned by jdev/sps/LoxAPPversion3). Each entry is one gzip file
+    holding the version on its first line followed by the structure JSON as sent
+    by the Miniserver, so it can be fed to StructureParser unchanged.
+    """
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"LoxAPP3_{UNSAFE_FILENAME_CHARS.sub('_', key)}.json.gz"
+
+    async def load(self, key: str, version: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """
+        Return the cached structure for key, or None if there is none or its
+        version differs. With version=None any cached structure is returned.
+        """
+        data = await self.load_bytes(key, version)
+        if data is None:
+            return None
+        # Several MB of JSON: parsed in a worker thread, not on the event loop
+        return await asyncio.to_thread(self._parse, key, data)
+
+    async def load_bytes(self, key: str, version: Optional[str] = None) -> Optional[bytes]:
+        """Like load(), but return the raw structure JSON."""
+        entry = await asyncio.to_thread(self._read, self.path_for(key))
+        if entry is None:
+            return None
+        cached_version, data = entry
+        if version is not None and cached_version != version:
+            log.debug(
+                "Cached structure for %s is outdated (%s != %s)", key, cached_version, version
+            )
+            return None
+        return data
+
+    async def cached_version(self, key: str) -> Optional[str]:
+        entry = await asyncio.to_thread(self._read, self.path_for(key))
+        return entry[0] if entry else None
+
+    async def save(self, key: str, version: str, structure: Dict[str, Any]) -> None:
+        data = json.dumps(structure, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        await self.save_bytes(key, version, data)
+
+    async def save_bytes(self, key: str, version: str, data: bytes) -> None:
+        """Store a structure file exactly as downloaded."""
+        await asyncio.to_thread(self._write, self.path_for(key), version, data)
+
+    async def clear(self, key: str) -> None:
+        await asyncio.to_thread(self.path_for(key).unlink, missing_ok=True)
+
+    @staticmethod
+    def _parse(key: str, data: bytes) -> Optional[Dict[str, Any]]:
+        try:
+            structure = json.loads(data)
+        except ValueError as err:
+            log.warning("Ignoring unreadable structure cache for %s: %s", key, err)
+            return None
+        return structure if isinstance(structure, dict) else None
+
+    @staticmethod
+    def _read(path: Path) -> Optional[Tuple[str, bytes]]:
+        try:
+            with gzip.open(path, "rb") as fh:
+                version = fh.readline().rstrip(b"\n").decode("utf-8")
+                data = fh.read()
+        except FileNotFoundError:
+            return None
+        except (OSError, EOFError, UnicodeDecodeError) as err:
+            log.warning("Ignoring unreadable structure cache %s: %s", path, err)
+            return None
+        if not version or not data:
+            return None
+        return version, data
+
+    @staticmethod
+    def _write(path: Path, version: str, data: bytes) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        with gzip.open(tmp, "wb", compresslevel=6) as fh:
+            fh.write(version.replace("\n", " ").encode("utf-8") + b"\n")
+            fh.write(data)
+        # Atomic replace so a crash never leaves a truncated cache behind
+        os.replace(tmp, path)
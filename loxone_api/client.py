@@ -4,11 +4,18 @@ loxone_api/client.py
 Async client for a Loxone Miniserver focusing on:
 - getkey2/<user>
 - getjwt/{hash}/{user}/{permission}/{uuid}/{info}
+- refreshjwt/{tokenHash}/{user} ahead of the token's validUntil
+- checktoken/{tokenHash}/{user} to reuse a token kept in a TokenStore
 
 Notes:
 - This implements the *HTTP JSON* flow using /jdev/ endpoints.
-- Some Miniservers require the *encrypted websocket* flow for getjwt; if yours returns 400,
-  you will need to implement keyexchange + encrypted commands via websocket (/ws/rfc6455).
+- State updates are pushed over the websocket (/ws/rfc6455) once the client is
+  authenticated, see start_event_stream().
+- Some Miniservers only accept getjwt encrypted. On HTTP 400 the client switches to
+  jdev/sys/enc commands with an RSA-exchanged AES session key (see crypto.py, needs the
+  optional cryptography package); encrypt_commands=True encrypts every command.
+  getjwt and refreshjwt then go through jdev/sys/fenc, so the token in the response
+  is encrypted as well.
 """
 
 from __future__ import annotations
@@ -17,16 +24,114 @@ import asyncio
 import json
 import logging
 import ssl
+import time
+import uuid as uuidlib
+from contextlib import contextmanager
 from dataclasses import dataclass
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Awaitable, Callable, Dict, Iterable, Iterator, Optional, Tuple, TypeVar, Union
 from urllib.parse import urljoin
 
 import aiohttp
 
-from .auth import JwtRequestParams, build_getjwt_path_from_getkey2
+from .auth import JwtRequestParams, LoxoneCredentials, build_token_hash
+from .bulk import HAS_NUMPY, ValueSnapshot
+from .cache import StructureCache
+from .crypto import HAS_CRYPTOGRAPHY, CommandEncryptor
+from .const import (
+    DEFAULT_STRUCT_PATH,
+    DEFAULT_WS_PATH,
+    EVENT_BATCH_SIZE,
+    JSON_OFFLOAD_SIZE,
+    LOXONE_EPOCH,
+    PING_INTERVAL,
+    RECONNECT_DELAY,
+    STRUCTURE_CHUNK_SIZE,
+    TOKEN_REFRESH_THRESHOLD,
+)
+from .events import (
+    MSG_DAYTIMER_EVENTS,
+    MSG_OUT_OF_SERVICE,
+    MSG_TEXT,
+    MSG_TEXT_EVENTS,
+    MSG_VALUE_EVENTS,
+    MSG_WEATHER_EVENTS,
+    MessageHeader,
+    StateIndex,
+    iter_daytimer_events,
+    iter_text_values,
+    iter_value_events,
+    iter_weather_events,
+    parse_header,
+    resolve_states,
+    value_states,
+)
+from .models import CallbackType, LoxoneState
+from .structure import ParsedStructure, StructureParser
+from .tokens import StoredToken, TokenStore
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is an optional extra
+    orjson = None
 
 log = logging.getLogger(__name__)
 
+_T = TypeVar("_T")
+
+# Needed to set up encryption, so never encrypted themselves
+_PLAIN_PATHS = ("/jdev/sys/getPublicKey", "/jdev/sys/getkey")
+# Encrypted as soon as the Miniserver asks for an encrypted getjwt
+_TOKEN_PATHS = ("/jdev/sys/getjwt/", "/jdev/sys/refreshjwt/", "/jdev/sys/checktoken/")
+# Sent as jdev/sys/fenc when encrypted, since their responses carry a token
+_FENC_PATHS = ("/jdev/sys/getjwt/", "/jdev/sys/refreshjwt/")
+
+# orjson is several times faster on the multi-megabyte structure file
+HAS_ORJSON = orjson is not None
+_json_loads = orjson.loads if HAS_ORJSON else json.loads
+
+# Event-table decoders yielding (binary uuid, value) pairs, keyed by header identifier
+_EVENT_TABLES = {
+    MSG_VALUE_EVENTS: iter_value_events,
+    MSG_TEXT_EVENTS: iter_text_values,
+    MSG_DAYTIMER_EVENTS: iter_daytimer_events,
+    MSG_WEATHER_EVENTS: iter_weather_events,
+}
+
+
+# SSL contexts shared by all clients, keyed by verify_tls. Loading the CA bundle is
+# slow, so it is done once per process instead of on every session (re)creation.
+_SSL_CONTEXTS: Dict[bool, ssl.SSLContext] = {}
+
+
+def _create_ssl_context(verify_tls: bool) -> ssl.SSLContext:
+    ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+    if verify_tls:
+        ssl_context.load_default_certs(ssl.Purpose.SERVER_AUTH)
+    else:
+        ssl_context.check_hostname = False
+        ssl_context.verify_mode = ssl.CERT_NONE
+    return ssl_context
+
+
+async def get_ssl_context(verify_tls: bool) -> ssl.SSLContext:
+    """Return the shared client SSL context for the given verification setting."""
+    ssl_context = _SSL_CONTEXTS.get(verify_tls)
+    if ssl_context is None:
+        ssl_context = await asyncio.to_thread(_create_ssl_context, verify_tls)
+        ssl_context = _SSL_CONTEXTS.setdefault(verify_tls, ssl_context)
+    return ssl_context
+
+
+def _parse_structure(
+    data: bytes, detail_keys: Optional[Iterable[str]], chunk_size: int
+) -> ParsedStructure:
+    """Run a whole structure file through a StructureParser (in a worker thread)."""
+    parser = StructureParser(detail_keys)
+    view = memoryview(data)
+    for start in range(0, len(view), chunk_size):
+        parser.feed(view[start : start + chunk_size])
+    return parser.close()
+
 
 class LoxoneAuthError(RuntimeError):
     pass
@@ -58,19 +163,60 @@ class LoxoneClient:
         verify_tls: bool = True,
         timeout_s: float = 120.0,
         session: Optional[aiohttp.ClientSession] = None,
+        ssl_context: Optional[ssl.SSLContext] = None,
+        structure_cache: Optional[StructureCache] = None,
+        token_store: Optional[TokenStore] = None,
+        encrypt_commands: bool = False,
     ):
         self.host = host
         self.port = port
         self.user = user
         self.password = password
+        # Caches the salted password hash between authentications
+        self._credentials = LoxoneCredentials(user, password)
         self.verify_tls = verify_tls
         self.timeout_s = timeout_s
 
         self.base_url = f"https://{self.host}:{self.port}/"
         self._session_external = session is not None
         self._session: Optional[aiohttp.ClientSession] = session
+        self._ssl_context = ssl_context
+        self.structure_cache = structure_cache
+        # Concurrent callers share one session creation and one authentication
+        self._session_lock = asyncio.Lock()
+        self._inflight: Dict[str, asyncio.Future] = {}
 
         self._jwt: Optional[str] = None
+        self._hash_alg = "SHA1"
+        # Unix time the JWT expires at (from getjwt/refreshjwt validUntil), if known
+        self._token_valid_until: Optional[float] = None
+        self._token_task: Optional[asyncio.Task] = None
+        # Persists the token so a restart can skip getkey2/getjwt (checked once, on first use)
+        self.token_store = token_store
+        self._token_restore_pending = token_store is not None
+        # Identifies this client to the Miniserver; reused (and persisted) so new
+        # tokens replace ours instead of piling up under fresh uuids
+        self.client_uuid = ""
+
+        # One AES session key (RSA-encrypted once) shared by all encrypted commands
+        self._encryptor: Optional[CommandEncryptor] = None
+        self._encrypt_commands = encrypt_commands
+        # Set on its own when a plain getjwt is rejected with HTTP 400
+        self._encrypt_auth = encrypt_commands
+
+        # Seconds spent per phase (version, download, cache, parse) by the last structure load
+        self.structure_timings: Dict[str, float] = {}
+
+        self._ws: Optional[aiohttp.ClientWebSocketResponse] = None
+        self._event_task: Optional[asyncio.Task] = None
+        self._event_callback: Optional[CallbackType] = None
+        # Told True once the stream is authenticated, False when it drops
+        self._connection_callback: Optional[Callable[[bool], None]] = None
+        self._state_index: Optional[StateIndex] = None
+        # With numpy available, full-table resyncs only dispatch values that changed
+        self._value_snapshot: Optional[ValueSnapshot] = ValueSnapshot() if HAS_NUMPY else None
+        # Set until the complete value table that follows enablebinstatusupdate arrives
+        self._expect_full_table = False
 
     async def __aenter__(self) -> "LoxoneClient":
         await self._ensure_session()
@@ -80,6 +226,13 @@ class LoxoneClient:
         await self.close()
 
     async def close(self) -> None:
+        await self.stop_token_refresh()
+        await self.stop_event_stream()
+        # Shared work outlives its cancelled callers; stop it before the session goes
+        inflight = list(self._inflight.values())
+        for future in inflight:
+            future.cancel()
+        await asyncio.gather(*inflight, return_exceptions=True)
         if self._session and not self._session_external:
             await self._session.close()
         self._session = None
@@ -88,6 +241,13 @@ class LoxoneClient:
         if self._session and not self._session.closed:
             return
 
+        async with self._session_lock:
+            # Another caller may have replaced the session while we waited
+            if self._session and not self._session.closed:
+                return
+            await self._create_session()
+
+    async def _create_session(self) -> None:
         # Close any existing dead session
         if self._session:
             try:
@@ -102,60 +262,82 @@ class LoxoneClient:
             total=None  # No total timeout - let server control connection lifetime
         )
 
-        ssl_context = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
-        if self.verify_tls:
-            await asyncio.to_thread(
-                ssl_context.load_default_certs, ssl.Purpose.SERVER_AUTH
-            )
-        else:
-            ssl_context.check_hostname = False
-            ssl_context.verify_mode = ssl.CERT_NONE
-
+        # Only the context is shared. TLS session resumption is not supported:
+        # asyncio cannot pass a saved ssl.SSLSession to new connections, so every
+        # new connection (including websocket reconnects) does a full handshake.
+        ssl_context = self._ssl_context or await get_ssl_context(self.verify_tls)
         connector = aiohttp.TCPConnector(ssl=ssl_context)
         self._session = aiohttp.ClientSession(timeout=timeout, connector=connector)
 
     def _full_url(self, path: str) -> str:
         return urljoin(self.base_url, path.lstrip("/"))
 
-    async def _get_text(self, path: str) -> Tuple[int, str]:
+    async def _get_bytes(self, path: str) -> Tuple[int, bytes]:
         await self._ensure_session()
         assert self._session is not None
 
         url = self._full_url(path)
         log.debug("GET %s", url)
 
-        headers = {}
-        if self._jwt:
-            headers["Authorization"] = f"Bearer {self._jwt}"
+        async with self._session.get(url, headers=self._auth_headers()) as resp:
+            body = await resp.read()
+            return resp.status, body
+
+    def _auth_headers(self) -> Optional[Dict[str, str]]:
+        return {"Authorization": f"Bearer {self._jwt}"} if self._jwt else None
 
-        async with self._session.get(url, headers=headers if headers else None) as resp:
-            text = await resp.text()
-            return resp.status, text
+    async def _get_text(self, path: str) -> Tuple[int, str]:
+        status, body = await self._get_bytes(path)
+        return status, body.decode("utf-8", errors="replace")
 
     @staticmethod
-    def _parse_json_text(text: str) -> Dict[str, Any]:
+    def _parse_json(data: Union[bytes, str]) -> Dict[str, Any]:
+        """
+        Parse a JSON response body, bytes or text. The happy path is one parse
+        straight from the body; only if that fails is the payload sanitised once
+        (BOM, NUL padding or other noise around the outermost object) and parsed again.
+        """
         try:
-            return json.loads(text)
-        except Exception:
-            sanitized = text.lstrip("\ufeff").strip("\x00")
-            try:
-                return json.loads(sanitized)
-            except Exception:
-                start = sanitized.find("{")
-                end = sanitized.rfind("}")
-                if start != -1 and end != -1 and end > start:
-                    return json.loads(sanitized[start : end + 1])
-                raise
+            return _json_loads(data)
+        except ValueError:
+            pass
+
+        if isinstance(data, str):
+            start, end = data.find("{"), data.rfind("}")
+        else:
+            start, end = data.find(b"{"), data.rfind(b"}")
+        if start == -1 or end <= start:
+            raise ValueError("No JSON object in response")
+        if HAS_ORJSON and not isinstance(data, str):
+            # orjson parses a view of the body directly, without copying the slice
+            return _json_loads(memoryview(data)[start : end + 1])
+        return _json_loads(data[start : end + 1])
 
     async def _get_json(self, path: str) -> Tuple[int, Dict[str, Any]]:
-        status, text = await self._get_text(path)
+        status, body = await self._get_bytes(path)
+        return status, await self._decode_json(status, body)
+
+    async def _decode_json(self, status: int, body: bytes) -> Dict[str, Any]:
         try:
-            data = self._parse_json_text(text)
+            if len(body) >= JSON_OFFLOAD_SIZE:
+                # Large bodies (the structure file) are parsed in a worker thread
+                return await asyncio.to_thread(self._parse_json, body)
+            return self._parse_json(body)
         except Exception:
             # Not JSON (often HTML errors)
-            raise LoxoneRequestError(f"Non-JSON response (status {status}): {text}")
-
-        return status, data
+            text = body.decode("utf-8", errors="replace")
+            error = LoxoneAuthError if status == 401 else LoxoneRequestError
+            raise error(f"Non-JSON response (status {status}): {text}")
+
+    @contextmanager
+    def _timed(self, phase: str) -> Iterator[None]:
+        """Add the time spent in the block to structure_timings[phase]."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.structure_timings[phase] = self.structure_timings.get(phase, 0.0) + elapsed
 
     @staticmethod
     def _extract_ll_value(payload: Dict[str, Any]) -> Any:
@@ -213,46 +395,66 @@ class LoxoneClient:
           1) getkey2/<user>
           2) getjwt/{hash}/{user}/{permission}/{uuid}/{info}
 
-        Returns JWT token string.
+        Returns JWT token string. Calls made while one is in flight share its result.
         """
+        # Only calls asking for the same token share one; the arguments are part of the key
+        return await self._single_flight(
+            f"authenticate/{permission}/{uuid}/{info}",
+            lambda: self._authenticate(permission, uuid, info),
+        )
+
+    async def _authenticate(self, permission: int, uuid: str, info: str) -> str:
         log.debug("Authenticating using getkey2/getjwt flow")
 
-        try:
-            key2 = await self.getkey2()
-        except Exception:
-            await self.close()
-            raise
+        key2 = await self.getkey2()
+
+        self._hash_alg = key2.hashAlg
 
         # Build path using correct salt + hashAlg + key decoding
         key_payload = {"key": key2.key, "salt": key2.salt, "hashAlg": key2.hashAlg}
-        params = JwtRequestParams(permission=permission, uuid=uuid, info=info)
-        jwt_path, dbg = build_getjwt_path_from_getkey2(
-            user=self.user,
-            password=self.password,
-            getkey2_value=key_payload,
-            params=params,
+        self.client_uuid = uuid or self.client_uuid or str(uuidlib.uuid4())
+        params = JwtRequestParams(permission=permission, uuid=self.client_uuid, info=info)
+        if not self._credentials.matches(self.user, self.password):
+            self._credentials = LoxoneCredentials(self.user, self.password)
+        jwt_path, dbg = self._credentials.getjwt_path(
+            key_payload, params, debug=log.isEnabledFor(logging.DEBUG)
         )
 
         # Debug without leaking password
-        log.debug("JWT build debug: %s", dbg)
-        log.debug("Auth URL: %s", self._full_url(jwt_path))
-
-        status, text = await self._get_text(jwt_path)
+        if dbg:
+            log.debug("JWT build debug: %s", dbg)
+            log.debug("Auth URL: %s", self._full_url(jwt_path))
+
+        if self._needs_encryption(jwt_path):
+            status, body = await self._get_encrypted(jwt_path)
+            text = body.decode("utf-8", errors="replace")
+            if status == 400:
+                # The Miniserver may have dropped our salt (e.g. after a reboot); start afresh
+                self._encryptor = None
+        else:
+            status, text = await self._get_text(jwt_path)
+            if status == 400 and HAS_CRYPTOGRAPHY:
+                # Common when the Miniserver expects an encrypted getjwt. The getkey2 key
+                # is used up by now, so run the whole flow again, encrypted.
+                log.debug("Plain getjwt rejected with HTTP 400, switching to encrypted commands")
+                self._encrypt_auth = True
+                return await self._authenticate(permission, uuid, info)
 
         if status == 401:
-            await self.close()
             raise LoxoneAuthError(f"Authentication failed with status 401: {text}")
         if status == 400:
-            # Common when Miniserver expects encrypted getjwt; keep message actionable.
-            await self.close()
+            # Keep the message actionable
+            hint = (
+                "even when encrypted"
+                if HAS_CRYPTOGRAPHY
+                else "your Miniserver likely requires encrypted JWT requests; "
+                "install the 'crypto' extra (cryptography) to enable them"
+            )
             raise LoxoneAuthError(
-                "Authentication failed with status 400 (Bad Request). "
-                "Your Miniserver likely requires encrypted JWT requests via websocket keyexchange "
-                "(encrypted command flow). Raw response: "
+                f"Authentication failed with status 400 (Bad Request), {hint}. Raw response: "
                 + text
             )
         if status != 200:
-            await self.close()
             raise LoxoneAuthError(f"Authentication failed with status {status}: {text}")
 
         try:
@@ -260,11 +462,19 @@ class LoxoneClient:
         except Exception:
             raise LoxoneAuthError(f"Authentication response was not JSON: {text}")
 
-        ll_value = self._extract_ll_value(payload)
+        token = self._store_token(self._extract_ll_value(payload))
+        if token is None:
+            raise LoxoneAuthError(f"getjwt returned no token: {payload}")
+        await self._save_token()
+        return token
 
+    def _store_token(self, ll_value: Any) -> Optional[str]:
+        """Keep the token (and its expiry) from a getjwt/refreshjwt LL.value."""
+        valid_until = None
         # Some Miniserver firmwares return an object under LL.value with token and metadata:
         #   LL.value == { 'token': '...', 'validUntil': ..., 'tokenRights': ..., ... }
         if isinstance(ll_value, dict):
+            valid_until = ll_value.get("validUntil")
             token = ll_value.get("token") or ll_value.get("Token")
             if token is None:
                 token = ll_value.get("value") or ll_value.get("Value")
@@ -279,11 +489,246 @@ class LoxoneClient:
             token = ll_value
 
         if not token or not isinstance(token, str):
-            raise LoxoneAuthError(f"getjwt returned no token: {payload}")
+            return None
 
         self._jwt = token
+        self._token_valid_until = (
+            LOXONE_EPOCH + float(valid_until) if isinstance(valid_until, (int, float)) else None
+        )
+        return token
+
+    @property
+    def token_valid_until(self) -> Optional[float]:
+        """Unix time the current JWT expires at, or None if unknown."""
+        return self._token_valid_until
+
+    @property
+    def token_needs_refresh(self) -> bool:
+        """True once the JWT is within TOKEN_REFRESH_THRESHOLD seconds of expiring."""
+        if self._token_valid_until is None:
+            return False
+        return self._token_valid_until - time.time() < TOKEN_REFRESH_THRESHOLD
+
+    async def refresh_token(self) -> str:
+        """
+        Extend the current JWT with jdev/sys/refreshjwt, which only needs an HMAC
+        of the token, no getkey2 salt or password hashing.
+        """
+        if not self._jwt:
+            raise LoxoneAuthError("Not authenticated. Call authenticate() first.")
+
+        token_hash = await self._token_hash()
+        payload = await self._jdev(f"sys/refreshjwt/{token_hash}/{self.user}")
+        code = self._extract_ll_code(payload)
+        if str(code) != "200":
+            raise LoxoneAuthError(f"refreshjwt returned code={code}: {payload}")
+
+        token = self._store_token(self._extract_ll_value(payload))
+        if token is None:
+            raise LoxoneAuthError(f"refreshjwt returned no token: {payload}")
+        log.debug("Token refreshed, valid until %s", self._token_valid_until)
+        await self._save_token()
         return token
 
+    async def check_token(self) -> bool:
+        """Ask the Miniserver (jdev/sys/checktoken) whether the current JWT is still valid."""
+        if not self._jwt:
+            return False
+        token_hash = await self._token_hash()
+        payload = await self._jdev(f"sys/checktoken/{token_hash}/{self.user}")
+        if str(self._extract_ll_code(payload)) != "200":
+            return False
+        value = self._extract_ll_value(payload)
+        if isinstance(value, dict) and isinstance(value.get("validUntil"), (int, float)):
+            self._token_valid_until = LOXONE_EPOCH + float(value["validUntil"])
+        return True
+
+    async def _token_hash(self) -> str:
+        """HMAC of the current JWT with a fresh key from jdev/sys/getkey."""
+        assert self._jwt is not None
+        key = self._extract_ll_value(await self._jdev("sys/getkey"))
+        if not isinstance(key, str) or not key:
+            raise LoxoneAuthError(f"getkey returned no key: {key}")
+        return build_token_hash(self._jwt, key, self._hash_alg)
+
+    @property
+    def token_key(self) -> str:
+        """Key of this client's entry in the token store."""
+        return f"{self.user}@{self.cache_key}"
+
+    async def restore_token(self) -> bool:
+        """
+        Take over the token from the token store if the Miniserver still accepts
+        it. Returns False (leaving the client unauthenticated) otherwise.
+        """
+        if self.token_store is None:
+            return False
+        stored = await self.token_store.load(self.token_key)
+        if stored is None:
+            return False
+        # Even if the token is gone, keep identifying as the same client
+        self.client_uuid = self.client_uuid or stored.client_uuid
+        if stored.valid_until is not None and stored.valid_until <= time.time():
+            log.debug("Stored token expired at %s", stored.valid_until)
+            return False
+
+        self._jwt = stored.token
+        self._token_valid_until = stored.valid_until
+        self._hash_alg = stored.hash_alg
+        valid = False
+        try:
+            valid = await self.check_token()
+        except (LoxoneAuthError, LoxoneRequestError) as err:
+            log.debug("Stored token was rejected: %s", err)
+        finally:
+            if not valid:
+                self._jwt = None
+                self._token_valid_until = None
+        log.debug("Stored token %s", "restored" if valid else "is no longer valid")
+        return valid
+
+    async def _single_flight(self, name: str, factory: Callable[[], Awaitable[_T]]) -> _T:
+        """Run factory() unless a call with this name is already running, and share its result."""
+        future = self._inflight.get(name)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            self._inflight[name] = future
+
+            def _done(done: asyncio.Future) -> None:
+                if self._inflight.get(name) is done:
+                    del self._inflight[name]
+                # Retrieved here so a failure nobody waits for any more is not reported as lost
+                if not done.cancelled():
+                    done.exception()
+
+            future.add_done_callback(_done)
+        # A cancelled caller must not cancel the work the others are waiting for
+        return await asyncio.shield(future)
+
+    async def _with_token_renewal(self, request: Callable[[], Awaitable[_T]]) -> _T:
+        """
+        Run request(); if the Miniserver rejects the token it was sent with
+        (LoxoneAuthError), authenticate again once and repeat it.
+        """
+        token = self._jwt
+        try:
+            return await request()
+        except LoxoneAuthError:
+            if token is None:
+                raise
+        # Requests rejected together share one authentication; later ones just retry
+        if self._jwt == token:
+            log.debug("Token rejected (HTTP 401), authenticating again")
+            await self.authenticate()
+        return await request()
+
+    def _needs_encryption(self, path: str) -> bool:
+        if path.startswith(_PLAIN_PATHS):
+            return False
+        if path.startswith(_TOKEN_PATHS):
+            return self._encrypt_auth
+        return self._encrypt_commands
+
+    async def _get_encrypted(self, path: str) -> Tuple[int, bytes]:
+        """
+        GET path encrypted with the shared session key: via jdev/sys/enc, or via
+        jdev/sys/fenc for _FENC_PATHS, whose successful responses are decrypted here.
+        """
+        encryptor = await self._get_encryptor()
+        fenc = path.startswith(_FENC_PATHS)
+        status, body = await self._get_bytes(
+            encryptor.command_path(path.lstrip("/"), encrypt_response=fenc)
+        )
+        if fenc and status == 200:
+            try:
+                body = encryptor.decrypt(body.decode("ascii").strip()).encode("utf-8")
+            except ValueError as err:
+                raise LoxoneAuthError(f"Unable to decrypt the fenc response: {err}") from err
+        return status, body
+
+    async def _get_encryptor(self) -> CommandEncryptor:
+        if self._encryptor is None:
+            self._encryptor = await self._single_flight("encryptor", self._create_encryptor)
+        return self._encryptor
+
+    async def _create_encryptor(self) -> CommandEncryptor:
+        if not HAS_CRYPTOGRAPHY:
+            raise LoxoneRequestError(
+                "Encrypted commands need the 'crypto' extra (cryptography) to be installed"
+            )
+        public_key = self._extract_ll_value(await self._jdev("sys/getPublicKey"))
+        if not isinstance(public_key, str) or not public_key:
+            raise LoxoneRequestError(f"getPublicKey returned no key: {public_key}")
+        # Key generation and the RSA encryption run once, off the event loop
+        return await asyncio.to_thread(CommandEncryptor, public_key)
+
+    async def _save_token(self) -> None:
+        if self.token_store is None or not self._jwt:
+            return
+        stored = StoredToken(
+            token=self._jwt,
+            valid_until=self._token_valid_until,
+            client_uuid=self.client_uuid,
+            hash_alg=self._hash_alg,
+        )
+        try:
+            await self.token_store.save(self.token_key, stored)
+        except Exception as err:
+            # The token is still usable for this session, only a restart pays for it
+            log.warning("Unable to persist token: %s", err)
+
+    async def ensure_token(self) -> str:
+        """
+        Return a usable JWT: the current one, a refreshed one when it is about to
+        expire, or a new one from the full getkey2/getjwt flow as a last resort.
+        The first call tries the token store before any of that. Concurrent
+        callers share one check, refresh or authentication.
+        """
+        return await self._single_flight("ensure_token", self._ensure_token)
+
+    async def _ensure_token(self) -> str:
+        if self._jwt is None and self._token_restore_pending:
+            await self.restore_token()
+            self._token_restore_pending = False
+        if self._jwt:
+            if not self.token_needs_refresh:
+                return self._jwt
+            assert self._token_valid_until is not None
+            # Only a token that has not expired yet can be extended
+            if self._token_valid_until > time.time():
+                try:
+                    return await self.refresh_token()
+                except (LoxoneAuthError, LoxoneRequestError) as err:
+                    log.warning("Token refresh failed, authenticating again: %s", err)
+        return await self.authenticate()
+
+    def start_token_refresh(self) -> None:
+        """Keep the JWT valid in the background, refreshing it ahead of expiry."""
+        if self._token_task is None or self._token_task.done():
+            self._token_task = asyncio.create_task(self._run_token_refresh())
+
+    async def stop_token_refresh(self) -> None:
+        task, self._token_task = self._token_task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+
+    async def _run_token_refresh(self) -> None:
+        while self._token_valid_until is not None:
+            delay = self._token_valid_until - time.time() - TOKEN_REFRESH_THRESHOLD
+            # Never spin, even if the Miniserver hands out tokens shorter than the threshold
+            await asyncio.sleep(max(delay, RECONNECT_DELAY))
+            try:
+                await self.ensure_token()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                log.warning("Unable to renew token, retrying in %ss: %s", RECONNECT_DELAY, err)
+                await asyncio.sleep(RECONNECT_DELAY)
+
     @property
     def jwt(self) -> Optional[str]:
         return self._jwt
@@ -293,28 +738,64 @@ class LoxoneClient:
         Convenience: call an arbitrary /jdev/... endpoint and return parsed JSON.
         Example:
           await client.jdev_get("sps/io/SomeControl")
+
+        A request rejected with HTTP 401 is repeated once with a new token.
         """
+        return await self._with_token_renewal(lambda: self._jdev(control_path))
+
+    async def _jdev(self, control_path: str) -> Dict[str, Any]:
         if not control_path.startswith("/"):
             control_path = "/" + control_path
         if not control_path.startswith("/jdev/"):
             control_path = "/jdev/" + control_path.lstrip("/")
 
-        status, payload = await self._get_json(control_path)
+        if self._needs_encryption(control_path):
+            status, body = await self._get_encrypted(control_path)
+            payload = await self._decode_json(status, body)
+        else:
+            status, payload = await self._get_json(control_path)
+        if status == 401:
+            raise LoxoneAuthError(f"Request unauthorized HTTP 401: {payload}")
         if status != 200:
             raise LoxoneRequestError(f"Request failed HTTP {status}: {payload}")
         return payload
 
+    @property
+    def cache_key(self) -> str:
+        return f"{self.host}:{self.port}"
+
+    async def get_structure_version(self) -> Optional[str]:
+        """Return the lastModified version of the Miniserver's structure file."""
+        payload = await self.jdev_get("sps/LoxAPPversion3")
+        version = self._extract_ll_value(payload)
+        return str(version) if version else None
+
     async def load_structure(self) -> Dict[str, Any]:
-        """Load the LoxAPP3.json structure file. Requires prior authentication."""
+        """
+        Load the LoxAPP3.json structure file. Requires prior authentication.
+
+        With a structure_cache, the file is only downloaded when
+        jdev/sps/LoxAPPversion3 reports a version other than the cached one.
+        """
         if not self._jwt:
             raise LoxoneAuthError("Not authenticated. Call authenticate() first.")
 
+        self.structure_timings = {}
+        version = await self._cache_version()
+        if version:
+            with self._timed("cache"):
+                cached = await self._load_cached_structure(version)
+            if cached is not None:
+                log.debug("Using cached structure (version %s)", version)
+                return cached
+
         log.debug("Loading structure with JWT: %s...", self._jwt[:24])
 
         try:
-            status, payload = await self._get_json("/data/LoxAPP3.json")
-            if status != 200:
-                raise LoxoneRequestError(f"Failed to load structure (HTTP {status})")
+            with self._timed("download"):
+                body = await self._with_token_renewal(self._download_structure)
+            with self._timed("parse"):
+                payload = await self._decode_json(200, body)
 
             # Try to extract structure from LL.value first, then fall back to top-level payload
             structure = self._extract_ll_value(payload)
@@ -323,12 +804,379 @@ class LoxoneClient:
 
             if not isinstance(structure, dict):
                 raise LoxoneRequestError(f"Unexpected structure type: {type(structure)}")
-
-            return structure
         except Exception as err:
             log.error("Error loading structure: %s", err)
             raise
 
+        if self.structure_cache is not None:
+            version = version or structure.get("lastModified")
+            if version:
+                try:
+                    await self.structure_cache.save(self.cache_key, str(version), structure)
+                except OSError as err:
+                    log.warning("Unable to cache structure: %s", err)
+
+        return structure
+
+    async def _load_cached_structure(self, version: str) -> Optional[Dict[str, Any]]:
+        """The cached structure of this version, parsed like a download (off the loop when large)."""
+        assert self.structure_cache is not None
+        data = await self.structure_cache.load_bytes(self.cache_key, version)
+        if data is None:
+            return None
+        try:
+            structure = await self._decode_json(200, data)
+        except LoxoneRequestError:
+            log.warning("Ignoring unreadable structure cache for %s", self.cache_key)
+            return None
+        return structure if isinstance(structure, dict) else None
+
+    async def _download_structure(self) -> bytes:
+        status, body = await self._get_bytes(DEFAULT_STRUCT_PATH)
+        if status == 401:
+            raise LoxoneAuthError("Failed to load structure (HTTP 401)")
+        if status != 200:
+            raise LoxoneRequestError(f"Failed to load structure (HTTP {status})")
+        return body
+
+    async def load_controls(
+        self,
+        detail_keys: Optional[Iterable[str]] = None,
+        chunk_size: int = STRUCTURE_CHUNK_SIZE,
+    ) -> ParsedStructure:
+        """
+        Stream LoxAPP3.json and build the controls entry by entry with a
+        StructureParser, without holding the whole parsed JSON tree in memory.
+        Uses the structure_cache the same way load_structure() does.
+        """
+        if not self._jwt:
+            raise LoxoneAuthError("Not authenticated. Call authenticate() first.")
+
+        keys = frozenset(detail_keys) if detail_keys is not None else None
+        self.structure_timings = {}
+        version = await self._cache_version()
+        if version:
+            parsed = await self._load_cached_controls(keys, version, chunk_size)
+            if parsed is not None:
+                log.debug("Using cached structure (version %s)", version)
+                return parsed
+
+        start = time.perf_counter()
+        parsed, raw = await self._with_token_renewal(
+            lambda: self._stream_controls(keys, chunk_size)
+        )
+        self.structure_timings["download"] = (
+            time.perf_counter() - start - self.structure_timings["parse"]
+        )
+
+        if raw is not None:
+            version = version or parsed.sections.get("lastModified")
+            if version:
+                try:
+                    await self.structure_cache.save_bytes(self.cache_key, str(version), b"".join(raw))
+                except OSError as err:
+                    log.warning("Unable to cache structure: %s", err)
+        return parsed
+
+    async def _stream_controls(
+        self, keys: Optional[frozenset], chunk_size: int
+    ) -> Tuple[ParsedStructure, Optional[list]]:
+        await self._ensure_session()
+        assert self._session is not None
+        parser = StructureParser(keys)
+        # The raw body is only kept when it will be cached; it is far smaller than the tree
+        raw: Optional[list] = [] if self.structure_cache is not None else None
+
+        url = self._full_url(DEFAULT_STRUCT_PATH)
+        log.debug("GET %s (streamed)", url)
+        try:
+            async with self._session.get(url, headers=self._auth_headers()) as resp:
+                if resp.status == 401:
+                    raise LoxoneAuthError("Failed to load structure (HTTP 401)")
+                if resp.status != 200:
+                    raise LoxoneRequestError(f"Failed to load structure (HTTP {resp.status})")
+                async for chunk in resp.content.iter_chunked(chunk_size):
+                    # Parsed in a worker thread, one chunk at a time, while the next one arrives
+                    with self._timed("parse"):
+                        await asyncio.to_thread(parser.feed, chunk)
+                    if raw is not None:
+                        raw.append(chunk)
+            with self._timed("parse"):
+                parsed = parser.close()
+        except ValueError as err:
+            log.error("Error loading structure: %s", err)
+            raise LoxoneRequestError(f"Malformed structure file: {err}") from err
+        return parsed, raw
+
+    async def load_cached_controls(
+        self,
+        detail_keys: Optional[Iterable[str]] = None,
+        version: Optional[str] = None,
+        chunk_size: int = STRUCTURE_CHUNK_SIZE,
+    ) -> Optional[ParsedStructure]:
+        """
+        Build the controls from the cached structure file (of the given version,
+        or whatever is cached), without contacting the Miniserver.
+        """
+        self.structure_timings = {}
+        return await self._load_cached_controls(detail_keys, version, chunk_size)
+
+    async def _load_cached_controls(
+        self, detail_keys: Optional[Iterable[str]], version: Optional[str], chunk_size: int
+    ) -> Optional[ParsedStructure]:
+        if self.structure_cache is None:
+            return None
+        with self._timed("cache"):
+            data = await self.structure_cache.load_bytes(self.cache_key, version)
+        if data is None:
+            return None
+
+        keys = frozenset(detail_keys) if detail_keys is not None else None
+        try:
+            with self._timed("parse"):
+                return await asyncio.to_thread(_parse_structure, data, keys, chunk_size)
+        except ValueError as err:
+            log.warning("Ignoring unreadable cached structure: %s", err)
+            return None
+
+    async def _cache_version(self) -> Optional[str]:
+        """Current structure version when a cache is configured, else None."""
+        if self.structure_cache is None:
+            return None
+        try:
+            with self._timed("version"):
+                return await self.get_structure_version()
+        except Exception as err:
+            log.warning("Unable to fetch structure version, not using cache: %s", err)
+            return None
+
+    # ------------------------------------------------------------------
+    # Websocket event stream
+    # ------------------------------------------------------------------
+
+    @property
+    def ws_url(self) -> str:
+        return f"wss://{self.host}:{self.port}{DEFAULT_WS_PATH}"
+
+    @property
+    def events_connected(self) -> bool:
+        return self._ws is not None and not self._ws.closed
+
+    async def start_event_stream(
+        self,
+        callback: CallbackType,
+        *,
+        state_index: Optional[StateIndex] = None,
+        connection_callback: Optional[Callable[[bool], None]] = None,
+    ) -> None:
+        """
+        Open the websocket, authenticate with the current JWT and enable binary
+        status updates. Every state pushed by the Miniserver is passed to callback;
+        the connection is re-established after RECONNECT_DELAY if it drops.
+
+        With a state_index keyed by binary state UUIDs, events are passed on already
+        resolved to (control uuid, state name); otherwise control_uuid is empty and
+        state holds the state UUID.
+
+        connection_callback, if given, is called with True whenever the stream is
+        (re)connected and with False whenever it drops.
+        """
+        if not self._jwt:
+            raise LoxoneAuthError("Not authenticated. Call authenticate() first.")
+
+        await self.stop_event_stream()
+        if callback != self._event_callback and self._value_snapshot is not None:
+            # A new consumer needs the full initial table, not just the differences
+            self._value_snapshot.clear()
+        self._event_callback = callback
+        self._state_index = state_index
+        self._connection_callback = connection_callback
+        self._event_task = asyncio.create_task(self._run_event_stream())
+
+    async def restart_event_stream(self) -> None:
+        """
+        Reconnect the event stream and pass on the whole initial value table, e.g.
+        after state_index gained states whose values were only seen unresolved.
+        """
+        if self._event_task is None or self._event_callback is None:
+            return
+        if self._value_snapshot is not None:
+            self._value_snapshot.clear()
+        await self.start_event_stream(
+            self._event_callback,
+            state_index=self._state_index,
+            connection_callback=self._connection_callback,
+        )
+
+    async def stop_event_stream(self) -> None:
+        task, self._event_task = self._event_task, None
+        if task:
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        if self._ws and not self._ws.closed:
+            await self._ws.close()
+        self._ws = None
+
+    async def _run_event_stream(self) -> None:
+        while True:
+            try:
+                await self._connect_events()
+                self._notify_connection(True)
+                await self._read_events()
+            except asyncio.CancelledError:
+                raise
+            except Exception as err:
+                log.warning("Event stream disconnected: %s", err)
+            self._notify_connection(False)
+
+            if self._ws and not self._ws.closed:
+                await self._ws.close()
+            self._ws = None
+            await asyncio.sleep(RECONNECT_DELAY)
+
+    def _notify_connection(self, connected: bool) -> None:
+        if self._connection_callback is not None:
+            self._connection_callback(connected)
+
+    async def _connect_events(self) -> None:
+        await self._ensure_session()
+        assert self._session is not None
+        # A reconnect after a long outage may find the token close to (or past) expiry
+        await self.ensure_token()
+        assert self._jwt is not None
+
+        log.debug("Connecting event stream to %s", self.ws_url)
+        self._ws = await self._session.ws_connect(
+            self.ws_url, protocols=("remotecontrol",), autoping=True
+        )
+
+        encryptor = await self._get_encryptor() if self._encrypt_auth else None
+        if encryptor is not None:
+            # Hand the session key over once; commands on this socket then omit it
+            payload = await self._ws_command(f"jdev/sys/keyexchange/{encryptor.session_key}")
+            code = self._extract_ll_code(payload)
+            if str(code) != "200":
+                raise LoxoneAuthError(f"keyexchange returned code={code}: {payload}")
+
+        key = self._extract_ll_value(await self._ws_command("jdev/sys/getkey"))
+        if not isinstance(key, str) or not key:
+            raise LoxoneAuthError(f"getkey returned no key: {key}")
+
+        token_hash = build_token_hash(self._jwt, key, self._hash_alg)
+        command = f"authwithtoken/{token_hash}/{self.user}"
+        if encryptor is not None:
+            command = encryptor.command_path(command, with_session_key=False).lstrip("/")
+        payload = await self._ws_command(command)
+        code = self._extract_ll_code(payload)
+        if str(code) != "200":
+            raise LoxoneAuthError(f"authwithtoken returned code={code}: {payload}")
+
+        self._expect_full_table = True
+        payload = await self._ws_command("jdev/sps/enablebinstatusupdate")
+        code = self._extract_ll_code(payload)
+        if str(code) != "200":
+            raise LoxoneRequestError(f"enablebinstatusupdate returned code={code}: {payload}")
+
+        log.debug("Event stream connected")
+
+    async def _ws_command(self, command: str) -> Dict[str, Any]:
+        """
+        Send a command over the websocket and wait for its text response. Event
+        tables arriving in the meantime are dispatched as usual.
+        """
+        assert self._ws is not None
+        await self._ws.send_str(command)
+        while True:
+            header, payload = await self._receive_message()
+            if header.identifier == MSG_TEXT:
+                return self._parse_json(payload)
+            await self._dispatch_message(header, payload)
+
+    async def _receive_message(self) -> Tuple[MessageHeader, Any]:
+        """Read one header + payload pair from the websocket."""
+        assert self._ws is not None
+        while True:
+            msg = await self._ws.receive()
+            if msg.type in (
+                aiohttp.WSMsgType.CLOSE,
+                aiohttp.WSMsgType.CLOSING,
+                aiohttp.WSMsgType.CLOSED,
+            ):
+                raise LoxoneRequestError(f"Websocket closed (code {self._ws.close_code})")
+            if msg.type == aiohttp.WSMsgType.ERROR:
+                raise LoxoneRequestError(f"Websocket error: {self._ws.exception()}")
+            if msg.type == aiohttp.WSMsgType.TEXT:
+                # Text without a preceding header; treat it as a plain response
+                return MessageHeader(MSG_TEXT, False, len(msg.data)), msg.data
+            if msg.type != aiohttp.WSMsgType.BINARY:
+                continue
+
+            header = parse_header(msg.data)
+            if header.estimated:
+                # An exact header always follows an estimated one
+                continue
+            if not header.has_payload:
+                return header, None
+
+            msg = await self._ws.receive()
+            if msg.type not in (aiohttp.WSMsgType.TEXT, aiohttp.WSMsgType.BINARY):
+                raise LoxoneRequestError(f"Expected payload after header, got {msg.type}")
+            return header, msg.data
+
+    async def _read_events(self) -> None:
+        keepalive = asyncio.create_task(self._keepalive())
+        try:
+            while True:
+                header, payload = await self._receive_message()
+                if header.identifier == MSG_OUT_OF_SERVICE:
+                    raise LoxoneRequestError("Miniserver is out of service")
+                await self._dispatch_message(header, payload)
+        finally:
+            keepalive.cancel()
+
+    async def _keepalive(self) -> None:
+        ws = self._ws
+        assert ws is not None
+        while not ws.closed:
+            await asyncio.sleep(PING_INTERVAL)
+            try:
+                await ws.send_str("keepalive")
+            except Exception as err:
+                # Closing the socket ends the read loop, which then reconnects
+                log.warning("Keepalive failed: %s", err)
+                await ws.close()
+                return
+
+    async def _dispatch_message(self, header: MessageHeader, payload: Any) -> None:
+        if header.identifier in _EVENT_TABLES and self._event_callback:
+            if header.identifier == MSG_VALUE_EVENTS and self._value_snapshot is not None:
+                full, self._expect_full_table = self._expect_full_table, False
+                events = self._value_snapshot.changes(payload, full=full)
+            else:
+                events = _EVENT_TABLES[header.identifier](payload)
+
+            if self._state_index is not None:
+                states = resolve_states(events, self._state_index)
+            else:
+                states = value_states(events)
+            await self._dispatch_states(states)
+        elif header.identifier == MSG_TEXT:
+            log.debug("Unsolicited text message: %s", payload)
+
+    async def _dispatch_states(self, states: Iterable[LoxoneState]) -> None:
+        """
+        Hand decoded states to the callback, yielding to the event loop every
+        EVENT_BATCH_SIZE entries so the initial status dump doesn't block it.
+        """
+        assert self._event_callback is not None
+        for count, state in enumerate(states, 1):
+            self._event_callback(state)
+            if count % EVENT_BATCH_SIZE == 0:
+                await asyncio.sleep(0)
+
 
 # Simple manual test helper:
 async def _demo():
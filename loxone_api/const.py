@@ -1,10 +1,19 @@
 """Constants for the Loxone Miniserver client."""
 
+import re
+
 DEFAULT_PORT = 80
 DEFAULT_TLS_PORT = 443
 DEFAULT_WS_PATH = "/ws/rfc6455"
 DEFAULT_STRUCT_PATH = "/data/LoxAPP3.json"
 
 TOKEN_REFRESH_THRESHOLD = 300  # seconds before expiry when refresh should occur
+LOXONE_EPOCH = 1230768000  # 2009-01-01 00:00:00 UTC; token validUntil counts seconds from here
 PING_INTERVAL = 25
 RECONNECT_DELAY = 10
+EVENT_BATCH_SIZE = 1000  # events dispatched before yielding to the event loop
+STRUCTURE_CHUNK_SIZE = 64 * 1024  # bytes fed to the incremental structure parser at once
+JSON_OFFLOAD_SIZE = 256 * 1024  # response bodies from this size on are parsed in a worker thread
+ENC_SALT_MAX_AGE = 3600  # seconds an encrypted-command salt is used before rotating it
+ENC_SALT_MAX_USES = 50  # encrypted commands sent with one salt before rotating it
+UNSAFE_FILENAME_CHARS = re.compile(r"[^A-Za-z0-9_.-]")  # replaced in cache and token file names
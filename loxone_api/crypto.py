@@ -0,0 +1,115 @@
+"""
+Encrypted commands (jdev/sys/enc and jdev/sys/fenc), requires cryptography.
+
+One AES-256-CBC key and IV are generated per CommandEncryptor and handed to
+the Miniserver once, RSA-encrypted with its public key (jdev/sys/getPublicKey).
+The resulting session key is reused for every command; only the salt prefixed
+to each command changes, so RSA is paid once instead of per request.
+"""
+
+from __future__ import annotations
+
+import base64
+import os
+import re
+import secrets
+import time
+from typing import Optional
+from urllib.parse import quote
+
+from .const import ENC_SALT_MAX_AGE, ENC_SALT_MAX_USES
+
+try:
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import padding
+    from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+except ImportError:  # pragma: no cover - cryptography is an optional extra
+    serialization = None
+
+HAS_CRYPTOGRAPHY = serialization is not None
+
+_AES_BLOCK = 16
+_PEM_ARMOR = re.compile(r"-----(BEGIN|END) [A-Z ]+-----|\s")
+
+
+def load_public_key(value: str):
+    """
+    Load the key from jdev/sys/getPublicKey. The Miniserver labels it as a
+    certificate and strips the line breaks, but it is a plain public key.
+    """
+    der = base64.b64decode(_PEM_ARMOR.sub("", value))
+    return serialization.load_der_public_key(der)
+
+
+class CommandEncryptor:
+    """Encrypts commands with one AES session, rotating the salt as it goes."""
+
+    def __init__(
+        self,
+        public_key: str,
+        *,
+        salt_max_age: float = ENC_SALT_MAX_AGE,
+        salt_max_uses: int = ENC_SALT_MAX_USES,
+    ) -> None:
+        if not HAS_CRYPTOGRAPHY:
+            raise RuntimeError("Encrypted commands need the 'cryptography' package")
+        self._key = os.urandom(32)
+        self._iv = os.urandom(16)
+        self._cipher = Cipher(algorithms.AES(self._key), modes.CBC(self._iv))
+        rsa_key = load_public_key(public_key)
+        secret = f"{self._key.hex()}:{self._iv.hex()}".encode("ascii")
+        # The only RSA operation; sent with every HTTP command or once via keyexchange
+        self.session_key = base64.b64encode(rsa_key.encrypt(secret, padding.PKCS1v15())).decode("ascii")
+
+        self.salt_max_age = salt_max_age
+        self.salt_max_uses = salt_max_uses
+        self._salt: Optional[str] = None
+        self._salt_uses = 0
+        self._salt_created = 0.0
+
+    @staticmethod
+    def _new_salt() -> str:
+        return secrets.token_hex(8)
+
+    def salted(self, command: str) -> str:
+        """Prefix command with the current salt, announcing a new one when it is due."""
+        now = time.monotonic()
+        if self._salt is None:
+            self._salt = self._new_salt()
+            self._salt_created, self._salt_uses = now, 0
+            prefix = f"salt/{self._salt}"
+        elif self._salt_uses >= self.salt_max_uses or now - self._salt_created >= self.salt_max_age:
+            previous, self._salt = self._salt, self._new_salt()
+            self._salt_created, self._salt_uses = now, 0
+            prefix = f"nextSalt/{previous}/{self._salt}"
+        else:
+            prefix = f"salt/{self._salt}"
+        self._salt_uses += 1
+        return f"{prefix}/{command.lstrip('/')}"
+
+    def encrypt(self, plaintext: str) -> str:
+        """AES-CBC with zero padding, base64 encoded."""
+        data = plaintext.encode("utf-8")
+        data += b"\0" * (-len(data) % _AES_BLOCK)
+        encryptor = self._cipher.encryptor()
+        return base64.b64encode(encryptor.update(data) + encryptor.finalize()).decode("ascii")
+
+    def decrypt(self, ciphertext: str) -> str:
+        """Decrypt a base64 payload encrypted with this session (e.g. a fenc response)."""
+        data = base64.b64decode(ciphertext)
+        decryptor = self._cipher.decryptor()
+        return (decryptor.update(data) + decryptor.finalize()).rstrip(b"\0").decode("utf-8")
+
+    def command_path(
+        self, command: str, *, encrypt_response: bool = False, with_session_key: bool = True
+    ) -> str:
+        """
+        The jdev/sys/enc (or fenc, to have the response encrypted as well) path
+        carrying command. HTTP requests need the session key on each request;
+        a websocket that went through keyexchange does not.
+        """
+        cipher = quote(self.encrypt(self.salted(command)), safe="")
+        path = f"/jdev/sys/{'fenc' if encrypt_response else 'enc'}/{cipher}"
+        if with_session_key:
+            path += f"?sk={quote(self.session_key, safe='')}"
+        return path
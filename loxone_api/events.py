@@ -0,0 +1,228 @@
+"""Message framing and event-table decoding for the Loxone websocket."""
+
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Tuple, Union
+
+from .models import LoxoneState
+
+# Identifier byte of the 8-byte message header (see "Message Header" in the docs)
+MSG_TEXT = 0
+MSG_BINARY_FILE = 1
+MSG_VALUE_EVENTS = 2
+MSG_TEXT_EVENTS = 3
+MSG_DAYTIMER_EVENTS = 4
+MSG_OUT_OF_SERVICE = 5
+MSG_KEEPALIVE = 6
+MSG_WEATHER_EVENTS = 7
+
+HEADER_LENGTH = 8
+VALUE_EVENT_LENGTH = 24
+
+_HEADER = struct.Struct("<BBBxI")
+_UUID_HEAD = struct.Struct("<IHH")
+_VALUE_EVENT = struct.Struct("<16sd")
+_TEXT_EVENT_HEAD = struct.Struct("<16s16sI")
+_DAYTIMER_EVENT_HEAD = struct.Struct("<16sdi")
+_DAYTIMER_ENTRY = struct.Struct("<iiiid")
+_WEATHER_EVENT_HEAD = struct.Struct("<16sIi")
+_WEATHER_ENTRY = struct.Struct("<iiiiidddddd")
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+# Maps a state UUID (string and/or 16-byte binary form) to (control uuid, state name)
+StateIndex = Mapping[Union[str, bytes], Tuple[str, str]]
+
+
+@dataclass(frozen=True)
+class MessageHeader:
+    """Header announcing the type and size of the next websocket message."""
+
+    identifier: int
+    estimated: bool
+    length: int
+
+    @property
+    def has_payload(self) -> bool:
+        # Keepalive and out-of-service headers are never followed by a payload
+        return self.identifier not in (MSG_KEEPALIVE, MSG_OUT_OF_SERVICE)
+
+
+def parse_header(data: bytes) -> MessageHeader:
+    """Parse an 8-byte message header, raising ValueError for anything else."""
+    if len(data) != HEADER_LENGTH or data[0] != 0x03:
+        raise ValueError(f"Not a Loxone message header: {bytes(data[:HEADER_LENGTH]).hex()}")
+    _, identifier, info, length = _HEADER.unpack(data)
+    return MessageHeader(identifier=identifier, estimated=bool(info & 0x01), length=length)
+
+
+def uuid_from_bytes(data: Buffer, offset: int = 0) -> str:
+    """Format a binary UUID the way the structure file spells it."""
+    d1, d2, d3 = _UUID_HEAD.unpack_from(data, offset)
+    return f"{d1:08x}-{d2:04x}-{d3:04x}-{data[offset + 8 : offset + 16].hex()}"
+
+
+# The set of state UUIDs is fixed per structure file, so formatting is memoised
+_uuid_str = lru_cache(maxsize=65536)(uuid_from_bytes)
+
+
+def uuid_to_bytes(uuid: str) -> bytes:
+    """Binary (wire) form of a structure-file UUID, raising ValueError if malformed."""
+    parts = uuid.split("-")
+    if [len(part) for part in parts] != [8, 4, 4, 16]:
+        raise ValueError(f"Not a Loxone UUID: {uuid}")
+    d1, d2, d3, d4 = parts
+    return _UUID_HEAD.pack(int(d1, 16), int(d2, 16), int(d3, 16)) + bytes.fromhex(d4)
+
+
+def iter_value_events(payload: Buffer) -> Iterator[Tuple[bytes, float]]:
+    """
+    Iterate (binary uuid, value) pairs of a value-state event table.
+
+    The table is walked in place with struct.iter_unpack over a memoryview, so no
+    per-entry slices of the frame are made. A trailing partial entry is ignored.
+    """
+    view = memoryview(payload)
+    end = len(view) - len(view) % VALUE_EVENT_LENGTH
+    return _VALUE_EVENT.iter_unpack(view[:end])
+
+
+def decode_value_events(payload: Buffer) -> Iterator[LoxoneState]:
+    """
+    Decode an event table of value states (16-byte UUID + little-endian double).
+
+    The Miniserver only knows state UUIDs, so the yielded states carry the UUID in
+    `state` and leave `control_uuid` empty for the caller to resolve.
+    """
+    return value_states(iter_value_events(payload))
+
+
+def value_states(events: Iterable[Tuple[bytes, Any]]) -> Iterator[LoxoneState]:
+    """Turn (binary uuid, value) pairs into unresolved LoxoneState updates."""
+    for raw_uuid, value in events:
+        yield LoxoneState(control_uuid="", state=_uuid_str(raw_uuid), value=value)
+
+
+def resolve_states(events: Iterable[Tuple[bytes, Any]], index: StateIndex) -> Iterator[LoxoneState]:
+    """
+    Route (binary uuid, value) pairs to their control with one dict lookup each,
+    skipping UUID formatting altogether. UUIDs missing from the index are dropped.
+    """
+    for raw_uuid, value in events:
+        owner = index.get(raw_uuid)
+        if owner is not None:
+            yield LoxoneState(control_uuid=owner[0], state=owner[1], value=value)
+
+
+def iter_text_events(payload: Buffer) -> Iterator[Tuple[bytes, bytes, str]]:
+    """
+    Iterate (binary uuid, binary icon uuid, text) triples of a text-state table.
+
+    Each entry is uuid + icon uuid + uint32 length followed by UTF-8 text padded to
+    a multiple of 4 bytes. Text is decoded straight from the frame buffer.
+    """
+    view = memoryview(payload)
+    size = len(view)
+    offset = 0
+    while offset + _TEXT_EVENT_HEAD.size <= size:
+        uuid, icon, length = _TEXT_EVENT_HEAD.unpack_from(view, offset)
+        start = offset + _TEXT_EVENT_HEAD.size
+        if start + length > size:
+            break
+        yield uuid, icon, str(view[start : start + length], "utf-8", "replace")
+        offset = start + ((length + 3) & ~3)
+
+
+def iter_text_values(payload: Buffer) -> Iterator[Tuple[bytes, str]]:
+    """Iterate (binary uuid, text) pairs of a text-state table, dropping icon UUIDs."""
+    for raw_uuid, _icon, text in iter_text_events(payload):
+        yield raw_uuid, text
+
+
+def decode_text_events(payload: Buffer) -> Iterator[LoxoneState]:
+    """Decode an event table of text states into unresolved LoxoneState updates."""
+    return value_states(iter_text_values(payload))
+
+
+def iter_daytimer_events(payload: Buffer) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+    """
+    Iterate (binary uuid, daytimer) pairs of a daytimer-state table.
+
+    The daytimer value is {"default": float, "entries": [...]} where each entry has
+    mode, from/to (minutes since midnight), needActivate and value.
+    """
+    view = memoryview(payload)
+    size = len(view)
+    offset = 0
+    while offset + _DAYTIMER_EVENT_HEAD.size <= size:
+        uuid, default, count = _DAYTIMER_EVENT_HEAD.unpack_from(view, offset)
+        start = offset + _DAYTIMER_EVENT_HEAD.size
+        end = start + max(count, 0) * _DAYTIMER_ENTRY.size
+        if end > size:
+            break
+        entries: List[Dict[str, Any]] = [
+            {
+                "mode": mode,
+                "from": start_min,
+                "to": end_min,
+                "needActivate": bool(need),
+                "value": value,
+            }
+            for mode, start_min, end_min, need, value in _DAYTIMER_ENTRY.iter_unpack(
+                view[start:end]
+            )
+        ]
+        yield uuid, {"default": default, "entries": entries}
+        offset = end
+
+
+def decode_daytimer_events(payload: Buffer) -> Iterator[LoxoneState]:
+    """Decode an event table of daytimer states into unresolved LoxoneState updates."""
+    return value_states(iter_daytimer_events(payload))
+
+
+_WEATHER_FIELDS = (
+    "timestamp",
+    "weatherType",
+    "windDirection",
+    "solarRadiation",
+    "relativeHumidity",
+    "temperature",
+    "perceivedTemperature",
+    "dewPoint",
+    "precipitation",
+    "windSpeed",
+    "barometricPressure",
+)
+
+
+def iter_weather_events(payload: Buffer) -> Iterator[Tuple[bytes, Dict[str, Any]]]:
+    """
+    Iterate (binary uuid, weather) pairs of a weather-state table.
+
+    The weather value is {"lastUpdate": seconds since 2009, "entries": [...]} with
+    one dict per forecast entry.
+    """
+    view = memoryview(payload)
+    size = len(view)
+    offset = 0
+    while offset + _WEATHER_EVENT_HEAD.size <= size:
+        uuid, last_update, count = _WEATHER_EVENT_HEAD.unpack_from(view, offset)
+        start = offset + _WEATHER_EVENT_HEAD.size
+        end = start + max(count, 0) * _WEATHER_ENTRY.size
+        if end > size:
+            break
+        entries = [
+            dict(zip(_WEATHER_FIELDS, entry))
+            for entry in _WEATHER_ENTRY.iter_unpack(view[start:end])
+        ]
+        yield uuid, {"lastUpdate": last_update, "entries": entries}
+        offset = end
+
+
+def decode_weather_events(payload: Buffer) -> Iterator[LoxoneState]:
+    """Decode an event table of weather states into unresolved LoxoneState updates."""
+    return value_states(iter_weather_events(payload))
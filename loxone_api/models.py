@@ -3,20 +3,26 @@
 from __future__ import annotations
 
 from dataclasses import dataclass, field
-from typing import Any, Callable, Dict, Optional
+from typing import Any, Callable, Mapping, Optional
 
 
-@dataclass
+@dataclass(slots=True)
 class LoxoneControl:
-    """Representation of a Loxone control entry."""
+    """
+    Representation of a Loxone control entry.
+
+    Subcontrols carry the uuid of their parent control and their own id within it.
+    """
 
     uuid: str
     name: str
     type: str
     room: Optional[str] = None
     category: Optional[str] = None
-    states: Dict[str, Any] = field(default_factory=dict)
-    details: Dict[str, Any] = field(default_factory=dict)
+    states: Mapping[str, Any] = field(default_factory=dict)
+    details: Mapping[str, Any] = field(default_factory=dict)
+    parent_uuid: Optional[str] = None
+    subcontrol_id: Optional[str] = None
 
 
 @dataclass
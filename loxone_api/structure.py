@@ -0,0 +1,368 @@
+"""Helpers for working with controls built from the LoxAPP3.json structure file."""
+
+from __future__ import annotations
+
+import codecs
+import json
+import re
+import sys
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+from .events import Buffer
+from .models import LoxoneControl
+
+# Shared by every control without states or (kept) details
+_EMPTY: Mapping[str, Any] = MappingProxyType({})
+
+
+@dataclass(frozen=True)
+class ControlsDiff:
+    """Control uuids that differ between two versions of the structure file."""
+
+    added: Tuple[str, ...] = ()
+    removed: Tuple[str, ...] = ()
+    changed: Tuple[str, ...] = ()
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+
+def diff_controls(
+    old: Mapping[str, LoxoneControl], new: Mapping[str, LoxoneControl]
+) -> ControlsDiff:
+    """Compare two control maps keyed by uuid."""
+    return ControlsDiff(
+        added=tuple(uuid for uuid in new if uuid not in old),
+        removed=tuple(uuid for uuid in old if uuid not in new),
+        changed=tuple(uuid for uuid, ctrl in new.items() if uuid in old and old[uuid] != ctrl),
+    )
+
+
+def build_controls(
+    structure: Mapping[str, Any], detail_keys: Optional[Collection[str]] = None
+) -> Dict[str, LoxoneControl]:
+    """
+    Build controls, including subcontrols under "<parent uuid>/<subcontrol uuid>",
+    from a parsed structure file.
+
+    Type, room, category and state-name strings are interned and states/details are
+    read-only copies (nested dicts and lists included), so thousands of controls
+    share their repeated strings and keep nothing of the parsed structure alive.
+    With detail_keys only those detail entries are kept.
+    """
+    rooms = _names(structure.get("rooms"))
+    categories = _names(structure.get("cats"))
+
+    controls: Dict[str, LoxoneControl] = {}
+    for control_uuid, control in (structure.get("controls") or {}).items():
+        for ctrl in _control_entries(control_uuid, control, rooms, categories, detail_keys):
+            controls[ctrl.uuid] = ctrl
+    return controls
+
+
+def _control_entries(
+    control_uuid: str,
+    control: Any,
+    rooms: Mapping[str, Optional[str]],
+    categories: Mapping[str, Optional[str]],
+    detail_keys: Optional[Collection[str]],
+) -> Iterator[LoxoneControl]:
+    """Yield a control followed by its subcontrols."""
+    if not isinstance(control, dict):
+        return
+
+    # Parent/top-level control
+    parent = LoxoneControl(
+        uuid=control_uuid,
+        name=control.get("name") or control_uuid,
+        type=sys.intern(control.get("type") or ""),
+        room=rooms.get(control.get("room")),
+        category=categories.get(control.get("cat")),
+        states=_readonly(control.get("states")),
+        details=_readonly(control.get("details"), detail_keys),
+    )
+    yield parent
+
+    # Subcontrols (e.g., LightControllerV2 outputs, moods, etc.)
+    for sc_uuid, sc_data in _subcontrols(control.get("subControls")):
+        name = sc_data.get("name") or sc_uuid
+        # Store subcontrol with composite UUID (parent/subcontrol_id) for proper lookup
+        composite_uuid = f"{control_uuid}/{sc_uuid}"
+        yield LoxoneControl(
+            uuid=composite_uuid,
+            # Prefix with parent name for clarity
+            name=f"{parent.name} - {name}" if parent.name else name,
+            type=sys.intern(sc_data.get("type") or sc_data.get("typeName") or ""),
+            room=parent.room,
+            category=parent.category,
+            states=_readonly(sc_data.get("states")),
+            details=_readonly(sc_data.get("details"), detail_keys),
+            parent_uuid=control_uuid,
+            subcontrol_id=sc_data.get("id") or sc_uuid,
+        )
+
+
+class ControlIndex:
+    """
+    Lookups over a control map, built once per structure load so consumers only
+    touch the controls they are interested in.
+    """
+
+    def __init__(self, controls: Mapping[str, LoxoneControl]) -> None:
+        self.controls = controls
+        self._by_type: Dict[str, List[LoxoneControl]] = {}
+        self._children: Dict[str, List[LoxoneControl]] = {}
+        for ctrl in controls.values():
+            self._by_type.setdefault(ctrl.type.lower(), []).append(ctrl)
+            if ctrl.parent_uuid:
+                self._children.setdefault(ctrl.parent_uuid, []).append(ctrl)
+
+        # Subcontrols grouped by their name without the "<parent> - " prefix
+        self._name_groups: Dict[str, Dict[str, List[LoxoneControl]]] = {}
+        for parent_uuid, children in self._children.items():
+            parent = controls.get(parent_uuid)
+            prefix = f"{parent.name} - " if parent and parent.name else None
+            groups: Dict[str, List[LoxoneControl]] = {}
+            for child in children:
+                name = child.name
+                if prefix and name.startswith(prefix):
+                    name = name[len(prefix) :]
+                groups.setdefault(name.strip().lower(), []).append(child)
+            self._name_groups[parent_uuid] = groups
+
+    def __len__(self) -> int:
+        return len(self.controls)
+
+    def of_type(self, *types: str) -> List[LoxoneControl]:
+        """Controls of any of the given types (case-insensitive)."""
+        if len(types) == 1:
+            return list(self._by_type.get(types[0].lower(), ()))
+        return [ctrl for type_ in types for ctrl in self._by_type.get(type_.lower(), ())]
+
+    def children(self, parent_uuid: str) -> Sequence[LoxoneControl]:
+        """Subcontrols of a control."""
+        return self._children.get(parent_uuid, ())
+
+    def name_groups(self, parent_uuid: str) -> Mapping[str, Sequence[LoxoneControl]]:
+        """A control's subcontrols keyed by normalised name, e.g. {"pendant": [...]}."""
+        return self._name_groups.get(parent_uuid, {})
+
+
+@dataclass
+class ParsedStructure:
+    """Controls plus every other top-level section of a structure file."""
+
+    sections: Dict[str, Any] = field(default_factory=dict)
+    controls: Dict[str, LoxoneControl] = field(default_factory=dict)
+
+
+_WHITESPACE = re.compile(r"[\s\x00\ufeff]*")
+
+
+class StructureParser:
+    """
+    Incremental LoxAPP3.json parser: feed() the body chunk by chunk, then close().
+
+    The "controls" section is never materialised as a whole. Each entry is decoded
+    on its own, turned into LoxoneControl objects and dropped, so peak memory stays
+    close to the size of the finished model instead of the full JSON tree. Other
+    top-level sections (rooms, cats, msInfo, ...) are small and kept as parsed.
+    """
+
+    def __init__(self, detail_keys: Optional[Collection[str]] = None) -> None:
+        self.detail_keys = detail_keys
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self._scan = json.JSONDecoder().raw_decode
+        self._buf = ""
+        self._pos = 0
+        self._state = self._expect_object
+        self._key: Optional[str] = None
+        self._result = ParsedStructure()
+        self._rooms: Optional[Dict[str, Optional[str]]] = None
+        self._categories: Optional[Dict[str, Optional[str]]] = None
+        # Controls seen before the rooms/cats sections, resolved in close()
+        self._unresolved: List[Tuple[LoxoneControl, Any, Any]] = []
+
+    def feed(self, data: Buffer) -> None:
+        self._parse(self._decoder.decode(data))
+
+    def close(self) -> ParsedStructure:
+        self._parse(self._decoder.decode(b"", final=True))
+        if self._state is not None:
+            raise ValueError("Truncated or malformed structure file")
+        rooms = _names(self._result.sections.get("rooms"))
+        categories = _names(self._result.sections.get("cats"))
+        for ctrl, room, cat in self._unresolved:
+            ctrl.room = rooms.get(room)
+            ctrl.category = categories.get(cat)
+        self._unresolved = []
+        return self._result
+
+    def _parse(self, text: str) -> None:
+        # Drop what was consumed so the buffer only holds the entry being read
+        self._buf = self._buf[self._pos :] + text
+        self._pos = 0
+        while self._state is not None and self._state():
+            pass
+
+    # Each state consumes what it can and returns True to continue, False for more data
+
+    def _skip(self) -> Optional[str]:
+        self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+        return self._buf[self._pos] if self._pos < len(self._buf) else None
+
+    def _expect_object(self) -> bool:
+        char = self._skip()
+        if char is None:
+            return False
+        if char != "{":
+            raise ValueError(f"Structure file is not a JSON object (found {char!r})")
+        self._pos += 1
+        self._state = self._top_key
+        return True
+
+    def _read_key(self, close_state: Any) -> Optional[bool]:
+        """Read '"key":', returning None once the key is read, else the state result."""
+        char = self._skip()
+        if char == ",":
+            self._pos += 1
+            char = self._skip()
+        if char is None:
+            return False
+        if char == "}":
+            self._pos += 1
+            self._state = close_state
+            return True
+        try:
+            key, end = self._scan(self._buf, self._pos)
+        except ValueError:
+            return False
+        colon = _WHITESPACE.match(self._buf, end).end()
+        if colon >= len(self._buf):
+            return False
+        if self._buf[colon] != ":" or not isinstance(key, str):
+            raise ValueError(f"Malformed structure file near offset {self._pos}")
+        self._key = key
+        self._pos = colon + 1
+        return None
+
+    def _top_key(self) -> bool:
+        result = self._read_key(close_state=None)
+        if result is not None:
+            return result
+        self._state = self._top_value
+        return True
+
+    def _top_value(self) -> bool:
+        char = self._skip()
+        if char is None:
+            return False
+        if self._key == "controls" and char == "{":
+            self._pos += 1
+            self._state = self._control_key
+            return True
+        value = self._decode_value()
+        if value is _INCOMPLETE:
+            return False
+        self._result.sections[self._key] = value
+        self._state = self._top_key
+        return True
+
+    def _control_key(self) -> bool:
+        result = self._read_key(close_state=self._top_key)
+        if result is not None:
+            return result
+        self._state = self._control_value
+        return True
+
+    def _control_value(self) -> bool:
+        if self._skip() is None:
+            return False
+        control = self._decode_value()
+        if control is _INCOMPLETE:
+            return False
+
+        if self._rooms is None or self._categories is None:
+            sections = self._result.sections
+            if "rooms" in sections and "cats" in sections:
+                self._rooms = _names(sections["rooms"])
+                self._categories = _names(sections["cats"])
+        resolved = self._rooms is not None and self._categories is not None
+        for ctrl in _control_entries(
+            self._key, control, self._rooms or {}, self._categories or {}, self.detail_keys
+        ):
+            self._result.controls[ctrl.uuid] = ctrl
+            if not resolved:
+                self._unresolved.append((ctrl, control.get("room"), control.get("cat")))
+        self._state = self._control_key
+        return True
+
+    def _decode_value(self) -> Any:
+        try:
+            value, end = self._scan(self._buf, self._pos)
+        except ValueError:
+            return _INCOMPLETE
+        if end >= len(self._buf) and isinstance(value, (int, float)):
+            # A number at the end of the buffer may continue in the next chunk
+            return _INCOMPLETE
+        self._pos = end
+        return value
+
+
+_INCOMPLETE = object()
+
+
+def _names(section: Any) -> Dict[str, Optional[str]]:
+    """Map the uuids of a rooms/cats section to their (interned) names."""
+    if not isinstance(section, dict):
+        return {}
+    return {
+        uuid: sys.intern(data["name"]) if isinstance(data.get("name"), str) else None
+        for uuid, data in section.items()
+        if isinstance(data, dict)
+    }
+
+
+def _subcontrols(sub_controls: Any) -> Iterable[Tuple[str, Dict[str, Any]]]:
+    """Yield (uuid, data) pairs from a subControls dict or list."""
+    if isinstance(sub_controls, dict):
+        pairs: Iterable[Tuple[Any, Any]] = sub_controls.items()
+    elif isinstance(sub_controls, list):
+        pairs = (
+            (sc.get("uuid") or sc.get("id") or sc.get("UUID") or "", sc)
+            for sc in sub_controls
+            if isinstance(sc, dict)
+        )
+    else:
+        return
+    for sc_uuid, sc_data in pairs:
+        if sc_uuid and isinstance(sc_data, dict):
+            yield sc_uuid, sc_data
+
+
+def _readonly(
+    mapping: Any, keys: Optional[Collection[str]] = None
+) -> Mapping[str, Any]:
+    """Compact read-only copy of a states/details dict with interned keys."""
+    if not isinstance(mapping, dict) or not mapping:
+        return _EMPTY
+    items = {
+        sys.intern(key): _detached(value)
+        for key, value in mapping.items()
+        if isinstance(key, str) and (keys is None or key in keys)
+    }
+    return MappingProxyType(items) if items else _EMPTY
+
+
+def _detached(value: Any) -> Any:
+    """
+    Read-only copy of a nested value, so controls hold no references into the
+    parsed structure and it can be garbage-collected once they are built.
+    """
+    if isinstance(value, dict):
+        return _readonly(value)
+    if isinstance(value, list):
+        return tuple(_detached(item) for item in value)
+    return value
@@ -0,0 +1,106 @@
+"""Persistence of the JWT between client instances (e.g. across restarts)."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import os
+from abc import ABC, abstractmethod
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Union
+
+from .const import UNSAFE_FILENAME_CHARS
+
+log = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class StoredToken:
+    """
+    A JWT with what is needed to use it again: its expiry (Unix time), the
+    hash algorithm for token HMACs and the client uuid it was issued to.
+    """
+
+    token: str
+    valid_until: Optional[float]
+    client_uuid: str
+    hash_alg: str = "SHA1"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Any) -> Optional["StoredToken"]:
+        """Build from to_dict() output, or None if data is not a valid entry."""
+        if not isinstance(data, dict):
+            return None
+        token, client_uuid = data.get("token"), data.get("client_uuid")
+        if not isinstance(token, str) or not token or not isinstance(client_uuid, str):
+            return None
+        valid_until = data.get("valid_until")
+        return cls(
+            token=token,
+            valid_until=float(valid_until) if isinstance(valid_until, (int, float)) else None,
+            client_uuid=client_uuid,
+            hash_alg=str(data.get("hash_alg") or "SHA1"),
+        )
+
+
+class TokenStore(ABC):
+    """
+    Where LoxoneClient keeps its token, keyed by user and Miniserver. Subclass
+    and implement all three methods to back it with other storage.
+    """
+
+    @abstractmethod
+    async def load(self, key: str) -> Optional[StoredToken]:
+        """The token saved under key, or None."""
+
+    @abstractmethod
+    async def save(self, key: str, token: StoredToken) -> None:
+        """Save token under key, replacing any previous one."""
+
+    @abstractmethod
+    async def clear(self, key: str) -> None:
+        """Forget the token saved under key, if any."""
+
+
+class FileTokenStore(TokenStore):
+    """One small JSON file per key, readable by the owner only."""
+
+    def __init__(self, directory: Union[str, Path]) -> None:
+        self.directory = Path(directory)
+
+    def path_for(self, key: str) -> Path:
+        return self.directory / f"token_{UNSAFE_FILENAME_CHARS.sub('_', key)}.json"
+
+    async def load(self, key: str) -> Optional[StoredToken]:
+        return await asyncio.to_thread(self._read, self.path_for(key))
+
+    async def save(self, key: str, token: StoredToken) -> None:
+        await asyncio.to_thread(self._write, self.path_for(key), token)
+
+    async def clear(self, key: str) -> None:
+        await asyncio.to_thread(self.path_for(key).unlink, missing_ok=True)
+
+    @staticmethod
+    def _read(path: Path) -> Optional[StoredToken]:
+        try:
+            data = json.loads(path.read_text(encoding="utf-8"))
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as err:
+            log.warning("Ignoring unreadable token file %s: %s", path, err)
+            return None
+        return StoredToken.from_dict(data)
+
+    @staticmethod
+    def _write(path: Path, token: StoredToken) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as fh:
+            json.dump(token.to_dict(), fh)
+        os.replace(tmp, path)
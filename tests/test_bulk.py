@@ -0,0 +1,70 @@
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure the project root is on the import path for tests without installation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("numpy")
+
+from loxone_api.bulk import ValueSnapshot
+
+
+def _uuid(i):
+    return struct.pack("<I", i) + bytes(12)
+
+
+def _table(values):
+    return b"".join(_uuid(i) + struct.pack("<d", v) for i, v in enumerate(values))
+
+
+def test_first_table_reports_everything():
+    snapshot = ValueSnapshot(min_bulk_entries=4)
+
+    changes = snapshot.changes(_table([1.0, 2.0, 3.0, 4.0]), full=True)
+
+    assert changes == [(_uuid(0), 1.0), (_uuid(1), 2.0), (_uuid(2), 3.0), (_uuid(3), 4.0)]
+    assert len(snapshot) == 4
+
+
+def test_resync_only_reports_changed_values():
+    snapshot = ValueSnapshot(min_bulk_entries=4)
+    snapshot.changes(_table([1.0, 2.0, float("nan"), 4.0]), full=True)
+
+    assert snapshot.changes(_table([1.0, 5.0, float("nan"), 4.0])) == [(_uuid(1), 5.0)]
+    assert snapshot.changes(_table([1.0, 5.0, float("nan"), 4.0])) == []
+
+
+def test_small_updates_feed_into_next_resync():
+    snapshot = ValueSnapshot(min_bulk_entries=4)
+    snapshot.changes(_table([1.0, 2.0, 3.0, 4.0]), full=True)
+
+    # Single-entry event for state 2, then a resync carrying the same value
+    update = _uuid(2) + struct.pack("<d", 9.0)
+    assert snapshot.changes(update) == [(_uuid(2), 9.0)]
+    assert snapshot.changes(update) == []
+    assert snapshot.changes(_table([1.0, 2.0, 9.0, 0.0])) == [(_uuid(3), 0.0)]
+
+
+def test_layout_change_diffs_against_known_values():
+    snapshot = ValueSnapshot(min_bulk_entries=2)
+    snapshot.changes(_table([1.0, 2.0]), full=True)
+
+    changes = snapshot.changes(_table([1.0, 7.0, 3.0]), full=True)
+
+    assert changes == [(_uuid(1), 7.0), (_uuid(2), 3.0)]
+
+
+def test_large_partial_tables_are_merged_into_the_snapshot():
+    snapshot = ValueSnapshot(min_bulk_entries=4)
+    snapshot.changes(_table([float(i) for i in range(10)]), full=True)
+
+    # A burst of changes for the first five states, large enough for the bulk path
+    assert snapshot.changes(_table([0.0, 1.0, 7.0, 3.0, 8.0])) == [(_uuid(2), 7.0), (_uuid(4), 8.0)]
+    assert len(snapshot) == 10
+
+    resync = [float(i) for i in range(10)]
+    resync[2], resync[4] = 7.0, 8.0
+    assert snapshot.changes(_table(resync), full=True) == []
@@ -0,0 +1,150 @@
+import asyncio
+import json
+import sys
+import threading
+from pathlib import Path
+
+# Ensure the project root is on the import path for tests without installation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.cache import StructureCache
+from loxone_api.client import LoxoneClient
+from loxone_api.const import JSON_OFFLOAD_SIZE
+
+STRUCTURE = {"lastModified": "2024-05-01 10:00:00", "controls": {"c1": {"name": "Küche"}}}
+
+
+def test_structure_cache_round_trip(tmp_path):
+    cache = StructureCache(tmp_path / "loxone")
+
+    async def run():
+        assert await cache.load("host:443") is None
+        await cache.save("host:443", "v1", STRUCTURE)
+        return (
+            await cache.load("host:443", "v1"),
+            await cache.load("host:443", "v2"),
+            await cache.cached_version("host:443"),
+        )
+
+    current, outdated, version = asyncio.run(run())
+
+    assert current == STRUCTURE
+    assert outdated is None
+    assert version == "v1"
+    assert cache.path_for("host:443").name == "LoxAPP3_host_443.json.gz"
+
+
+def test_structure_cache_ignores_corrupt_file(tmp_path):
+    cache = StructureCache(tmp_path)
+    cache.path_for("host:443").write_bytes(b"not gzip")
+
+    assert asyncio.run(cache.load("host:443")) is None
+
+
+def make_client(monkeypatch, tmp_path, version):
+    client = LoxoneClient(
+        host="example.com", user="user", password="pass", structure_cache=StructureCache(tmp_path)
+    )
+    client._jwt = "jwt-token"
+    downloads = []
+
+    async def fake_get_json(self, path):
+        assert path == "/jdev/sps/LoxAPPversion3"
+        return 200, {"LL": {"code": "200", "value": version}}
+
+    async def fake_get_bytes(self, path):
+        downloads.append(path)
+        return 200, json.dumps(STRUCTURE).encode()
+
+    monkeypatch.setattr(LoxoneClient, "_get_json", fake_get_json)
+    monkeypatch.setattr(LoxoneClient, "_get_bytes", fake_get_bytes)
+    return client, downloads
+
+
+def test_load_structure_downloads_only_when_version_changes(monkeypatch, tmp_path):
+    client, downloads = make_client(monkeypatch, tmp_path, "v1")
+
+    assert asyncio.run(client.load_structure()) == STRUCTURE
+    assert asyncio.run(client.load_structure()) == STRUCTURE
+    assert downloads == ["/data/LoxAPP3.json"]
+
+    assert set(client.structure_timings) == {"version", "cache"}
+
+    client, downloads = make_client(monkeypatch, tmp_path, "v2")
+
+    assert asyncio.run(client.load_structure()) == STRUCTURE
+    assert downloads == ["/data/LoxAPP3.json"]
+    assert set(client.structure_timings) == {"version", "cache", "download", "parse"}
+
+
+def test_large_cached_structure_is_parsed_off_the_event_loop(monkeypatch, tmp_path):
+    client, downloads = make_client(monkeypatch, tmp_path, "v1")
+    large = {**STRUCTURE, "controls": {"c1": {"name": "x" * JSON_OFFLOAD_SIZE}}}
+    asyncio.run(client.structure_cache.save(client.cache_key, "v1", large))
+    threads = []
+    parse_json = LoxoneClient._parse_json
+
+    def recording_parse_json(data):
+        threads.append(threading.get_ident())
+        return parse_json(data)
+
+    monkeypatch.setattr(LoxoneClient, "_parse_json", staticmethod(recording_parse_json))
+
+    assert asyncio.run(client.load_structure()) == large
+    assert downloads == []
+    assert threads and threads[0] != threading.get_ident()
+
+
+class FakeStreamResponse:
+    def __init__(self, body, chunk_size=16):
+        self.status = 200
+        self.body = body
+        self.content = self
+        self.chunk_size = chunk_size
+
+    async def iter_chunked(self, size):
+        for start in range(0, len(self.body), self.chunk_size):
+            yield self.body[start : start + self.chunk_size]
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+
+class FakeSession:
+    closed = False
+
+    def __init__(self, body):
+        self.body = body
+        self.requests = []
+
+    def get(self, url, headers=None):
+        self.requests.append((url, headers))
+        return FakeStreamResponse(self.body)
+
+
+def test_load_controls_streams_and_caches_raw_structure(monkeypatch, tmp_path):
+    body = json.dumps({"rooms": {"r1": {"name": "Küche"}}, **STRUCTURE}).encode()
+    session = FakeSession(body)
+    cache = StructureCache(tmp_path)
+    client = LoxoneClient(
+        host="example.com", user="user", password="pass", session=session, structure_cache=cache
+    )
+    client._jwt = "jwt-token"
+
+    async def fake_version(self):
+        return "v1"
+
+    monkeypatch.setattr(LoxoneClient, "get_structure_version", fake_version)
+
+    parsed = asyncio.run(client.load_controls())
+    cached = asyncio.run(client.load_controls())
+
+    assert [url for url, _ in session.requests] == ["https://example.com:443/data/LoxAPP3.json"]
+    assert session.requests[0][1] == {"Authorization": "Bearer jwt-token"}
+    assert parsed.controls["c1"].name == "Küche"
+    assert cached.controls == parsed.controls
+    assert set(client.structure_timings) == {"version", "cache", "parse"}
+    assert asyncio.run(cache.load_bytes(client.cache_key, "v1")) == body
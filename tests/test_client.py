@@ -1,14 +1,24 @@
 import asyncio
 import json
+import logging
+import ssl
+import struct
 import sys
+import threading
+import time
 from pathlib import Path
 
+import aiohttp
 import pytest
 
 # Ensure the project root is on the import path for tests without installation
 sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
 
 from loxone_api.client import GetKey2Result, LoxoneAuthError, LoxoneClient, LoxoneRequestError
+from loxone_api import auth
+from loxone_api.auth import JwtRequestParams, LoxoneCredentials, build_getjwt_path_from_getkey2, build_token_hash
+from loxone_api.const import JSON_OFFLOAD_SIZE, LOXONE_EPOCH, TOKEN_REFRESH_THRESHOLD
+from loxone_api.events import MSG_VALUE_EVENTS, MessageHeader
 
 
 def test_getkey2_parses_success(monkeypatch):
@@ -58,6 +68,105 @@ def test_authenticate_sets_jwt(monkeypatch):
     assert client.jwt == "jwt-token"
 
 
+def test_authenticate_tracks_token_expiry(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    valid_until = int(time.time()) - LOXONE_EPOCH + 3600
+
+    async def fake_getkey2(self):
+        return GetKey2Result(key="aa", salt="bb", hashAlg="SHA256")
+
+    async def fake_get_text(self, path):
+        return 200, json.dumps({"LL": {"value": {"token": "jwt-token", "validUntil": valid_until}}})
+
+    monkeypatch.setattr(LoxoneClient, "getkey2", fake_getkey2)
+    monkeypatch.setattr(LoxoneClient, "_get_text", fake_get_text)
+
+    asyncio.run(client.authenticate())
+
+    assert client.token_valid_until == LOXONE_EPOCH + valid_until
+    assert client.token_needs_refresh is False
+
+
+def make_expiring_client(monkeypatch, seconds_left, refresh_code="200"):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    client._jwt = "old-token"
+    client._token_valid_until = time.time() + seconds_left
+    calls = []
+
+    async def fake_get_json(self, path):
+        calls.append(path)
+        if path == "/jdev/sys/getkey":
+            return 200, {"LL": {"code": "200", "value": "41424344"}}
+        valid_until = int(time.time()) - LOXONE_EPOCH + 3600
+        value = {"token": "new-token", "validUntil": valid_until}
+        return 200, {"LL": {"code": refresh_code, "value": value}}
+
+    async def fake_authenticate(self, **kwargs):
+        calls.append("authenticate")
+        self._jwt = "full-auth-token"
+        return self._jwt
+
+    monkeypatch.setattr(LoxoneClient, "_get_json", fake_get_json)
+    monkeypatch.setattr(LoxoneClient, "authenticate", fake_authenticate)
+    return client, calls
+
+
+def test_ensure_token_keeps_a_fresh_token(monkeypatch):
+    client, calls = make_expiring_client(monkeypatch, seconds_left=TOKEN_REFRESH_THRESHOLD + 60)
+
+    assert asyncio.run(client.ensure_token()) == "old-token"
+    assert calls == []
+
+
+def test_ensure_token_refreshes_before_expiry(monkeypatch):
+    client, calls = make_expiring_client(monkeypatch, seconds_left=60)
+
+    assert asyncio.run(client.ensure_token()) == "new-token"
+    token_hash = build_token_hash("old-token", "41424344", "SHA1")
+    assert calls == ["/jdev/sys/getkey", f"/jdev/sys/refreshjwt/{token_hash}/user"]
+    assert client.token_needs_refresh is False
+
+
+def test_ensure_token_falls_back_to_full_authentication(monkeypatch):
+    client, calls = make_expiring_client(monkeypatch, seconds_left=60, refresh_code="401")
+    assert asyncio.run(client.ensure_token()) == "full-auth-token"
+    assert calls[-1] == "authenticate"
+
+    client, calls = make_expiring_client(monkeypatch, seconds_left=-60)
+    assert asyncio.run(client.ensure_token()) == "full-auth-token"
+    assert calls == ["authenticate"]
+
+
+def test_credentials_hash_the_password_once_per_salt(monkeypatch, caplog):
+    hashed = []
+    hash_hex = auth._hash_hex
+
+    def counting_hash_hex(hash_alg, s):
+        hashed.append(s)
+        return hash_hex(hash_alg, s)
+
+    monkeypatch.setattr(auth, "_hash_hex", counting_hash_hex)
+    credentials = LoxoneCredentials(" user ", "pass\n")
+    key2 = {"key": "41424344", "salt": "bb", "hashAlg": "SHA256"}
+    params = JwtRequestParams(permission=2, uuid="uuid-1")
+
+    with caplog.at_level(logging.DEBUG, logger="loxone_api.auth"):
+        first, debug = credentials.getjwt_path(key2, params)
+        second, _ = credentials.getjwt_path({**key2, "key": "45464748"}, params)
+        credentials.getjwt_path({**key2, "salt": "cc"}, params)
+
+    assert hashed == ["pass:bb", "pass:cc"]
+    assert first != second
+    assert first.endswith("/user/2/uuid-1/loxone_api")
+    # The debug payload (with the password hash) is only built when asked for
+    assert debug == {}
+    _, debug = credentials.getjwt_path(key2, params, debug=True)
+    assert debug["pw_hash"] == hash_hex("SHA256", "pass:bb").upper()
+    assert hashed == ["pass:bb", "pass:cc"]
+    # The one-off helper builds the same path, hashing from scratch
+    assert build_getjwt_path_from_getkey2("user", "pass", key2, params)[0] == first
+
+
 def test_authenticate_handles_auth_errors(monkeypatch):
     client = LoxoneClient(host="example.com", user="user", password="pass")
 
@@ -84,3 +193,347 @@ def test_jdev_get_prefixes_path(monkeypatch):
 
     response = asyncio.run(client.jdev_get("sps/io/Control"))
     assert response == {"LL": {"value": {"result": True}}}
+
+
+def make_rebooted_client(monkeypatch):
+    """A client whose token the Miniserver no longer accepts."""
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    client._jwt = "old-token"
+    logins = []
+
+    async def fake_getkey2(self):
+        logins.append("getkey2")
+        await asyncio.sleep(0.01)
+        return GetKey2Result(key="aa", salt="bb", hashAlg="SHA1")
+
+    async def fake_get_text(self, path):
+        await asyncio.sleep(0.01)
+        return 200, json.dumps({"LL": {"value": "new-token"}})
+
+    async def fake_get_json(self, path):
+        await asyncio.sleep(0)
+        if self.jwt != "new-token":
+            return 401, {}
+        return 200, {"LL": {"code": "200", "value": path}}
+
+    monkeypatch.setattr(LoxoneClient, "getkey2", fake_getkey2)
+    monkeypatch.setattr(LoxoneClient, "_get_text", fake_get_text)
+    monkeypatch.setattr(LoxoneClient, "_get_json", fake_get_json)
+    return client, logins
+
+
+def test_concurrent_authentication_is_shared(monkeypatch):
+    client, logins = make_rebooted_client(monkeypatch)
+    client._jwt = None
+
+    async def run():
+        return await asyncio.gather(*(client.ensure_token() for _ in range(5)), client.authenticate())
+
+    assert asyncio.run(run()) == ["new-token"] * 6
+    assert logins == ["getkey2"]
+
+
+def test_authentication_is_only_shared_for_the_same_arguments(monkeypatch):
+    client, logins = make_rebooted_client(monkeypatch)
+    client._jwt = None
+
+    async def run():
+        await asyncio.gather(client.authenticate(), client.authenticate(permission=4))
+
+    asyncio.run(run())
+    assert logins == ["getkey2", "getkey2"]
+
+
+def test_rejected_requests_renew_the_token_once_and_retry(monkeypatch):
+    client, logins = make_rebooted_client(monkeypatch)
+
+    async def run():
+        return await asyncio.gather(*(client.jdev_get(f"sps/io/c{i}") for i in range(5)))
+
+    responses = asyncio.run(run())
+
+    assert [r["LL"]["value"] for r in responses] == [f"/jdev/sps/io/c{i}" for i in range(5)]
+    assert logins == ["getkey2"]
+    # If authenticating again fails too, the caller gets that error
+    client._jwt = "expired-again"
+    monkeypatch.setattr(LoxoneClient, "_get_text", lambda self, path: _unauthorized())
+    with pytest.raises(LoxoneAuthError):
+        asyncio.run(client.jdev_get("sps/io/c0"))
+
+
+async def _unauthorized():
+    return 401, "Unauthorized"
+
+
+def test_close_stops_shared_authentication(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    started = asyncio.Event()
+
+    async def slow_getkey2():
+        started.set()
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(client, "getkey2", slow_getkey2)
+
+    async def run():
+        caller = asyncio.create_task(client.authenticate())
+        await started.wait()
+        caller.cancel()
+        await asyncio.gather(caller, return_exceptions=True)
+        # The shielded authentication is still running until close() stops it
+        assert client._inflight
+        await client.close()
+        return client._inflight, client._session
+
+    inflight, session = asyncio.run(run())
+    assert inflight == {}
+    assert session is None
+
+
+def test_concurrent_callers_share_one_session(monkeypatch):
+    created = []
+    original = LoxoneClient._create_session
+
+    async def counting_create_session(self):
+        created.append(self)
+        await asyncio.sleep(0.01)
+        await original(self)
+
+    monkeypatch.setattr(LoxoneClient, "_create_session", counting_create_session)
+
+    async def run():
+        client = LoxoneClient(
+            host="example.com", user="user", password="pass", ssl_context=ssl.create_default_context()
+        )
+        await asyncio.gather(*(client._ensure_session() for _ in range(5)))
+        session = client._session
+        await client.close()
+        return session
+
+    assert asyncio.run(run()) is not None
+    assert len(created) == 1
+
+
+class FakeWebSocket:
+    """Replays queued Miniserver messages and records what the client sends."""
+
+    def __init__(self, messages):
+        self.messages = list(messages)
+        self.sent = []
+        self.closed = False
+        self.close_code = None
+
+    async def send_str(self, data):
+        self.sent.append(data)
+
+    async def receive(self):
+        if not self.messages:
+            return aiohttp.WSMessage(aiohttp.WSMsgType.CLOSED, None, None)
+        kind, data = self.messages.pop(0)
+        return aiohttp.WSMessage(kind, data, None)
+
+    async def close(self):
+        self.closed = True
+
+
+def _ws_text(payload):
+    text = json.dumps(payload)
+    header = bytes([0x03, 0x00, 0x00, 0x00]) + struct.pack("<I", len(text))
+    return [(aiohttp.WSMsgType.BINARY, header), (aiohttp.WSMsgType.TEXT, text)]
+
+
+def test_event_stream_authenticates_and_dispatches_values():
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    client._jwt = "jwt-token"
+
+    table = bytes(16) + struct.pack("<d", 42.0)
+    ws = FakeWebSocket(
+        _ws_text({"LL": {"control": "jdev/sys/getkey", "value": "41424344", "Code": "200"}})
+        + _ws_text({"LL": {"control": "authwithtoken", "value": "", "Code": "200"}})
+        + _ws_text({"LL": {"control": "dev/sps/enablebinstatusupdate", "value": "1", "Code": "200"}})
+        + [
+            (aiohttp.WSMsgType.BINARY, bytes([0x03, 0x02, 0x00, 0x00]) + struct.pack("<I", len(table))),
+            (aiohttp.WSMsgType.BINARY, table),
+        ]
+    )
+
+    class FakeSession:
+        closed = False
+
+        async def ws_connect(self, url, **kwargs):
+            assert url == "wss://example.com:443/ws/rfc6455"
+            return ws
+
+    client._session = FakeSession()
+    received = []
+    client._event_callback = received.append
+
+    async def run():
+        await client._connect_events()
+        with pytest.raises(LoxoneRequestError):
+            await client._read_events()
+
+    asyncio.run(run())
+
+    assert ws.sent[0] == "jdev/sys/getkey"
+    assert ws.sent[1].startswith("authwithtoken/") and ws.sent[1].endswith("/user")
+    assert ws.sent[2] == "jdev/sps/enablebinstatusupdate"
+    assert [(s.state, s.value) for s in received] == [
+        ("00000000-0000-0000-0000000000000000", 42.0)
+    ]
+
+
+def test_restart_event_stream_replays_the_full_table(monkeypatch):
+    pytest.importorskip("numpy")
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    client._jwt = "jwt-token"
+    table = b"".join(struct.pack("<I", i) + bytes(12) + struct.pack("<d", i) for i in range(100))
+    received = []
+
+    async def fake_run():
+        client._expect_full_table = True
+        header = MessageHeader(MSG_VALUE_EVENTS, False, len(table))
+        await client._dispatch_message(header, table)
+        await asyncio.sleep(10)
+
+    monkeypatch.setattr(client, "_run_event_stream", fake_run)
+
+    async def run():
+        await client.start_event_stream(received.append)
+        await asyncio.sleep(0)
+        first = len(received)
+        # The same table again is filtered by the snapshot; a restart passes all of it on
+        await client.restart_event_stream()
+        await asyncio.sleep(0)
+        await client.stop_event_stream()
+        return first, len(received) - first
+
+    assert asyncio.run(run()) == (100, 100)
+
+
+def test_event_stream_reports_connection_changes(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    client._jwt = "jwt-token"
+    changes = []
+
+    async def connect():
+        pass
+
+    async def read():
+        raise LoxoneRequestError("Websocket closed")
+
+    monkeypatch.setattr(client, "_connect_events", connect)
+    monkeypatch.setattr(client, "_read_events", read)
+
+    async def run():
+        await client.start_event_stream(lambda state: None, connection_callback=changes.append)
+        await asyncio.sleep(0)
+        await client.stop_event_stream()
+
+    asyncio.run(run())
+
+    assert changes == [True, False]
+
+
+def test_failed_keepalive_closes_the_socket(monkeypatch):
+    monkeypatch.setattr("loxone_api.client.PING_INTERVAL", 0)
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+
+    class BrokenWebSocket(FakeWebSocket):
+        async def send_str(self, data):
+            raise ConnectionResetError("gone")
+
+    ws = BrokenWebSocket([])
+    client._ws = ws
+
+    asyncio.run(client._keepalive())
+
+    assert ws.closed
+
+
+def test_ssl_context_is_shared_between_sessions():
+    async def run():
+        first = LoxoneClient(host="example.com", user="user", password="pass", verify_tls=False)
+        second = LoxoneClient(host="example.com", user="user", password="pass", verify_tls=False)
+        await first._ensure_session()
+        await second._ensure_session()
+        contexts = (first._session.connector._ssl, second._session.connector._ssl)
+        await first.close()
+        await second.close()
+        return contexts
+
+    first_ctx, second_ctx = asyncio.run(run())
+    assert first_ctx is second_ctx
+    assert first_ctx.verify_mode == ssl.CERT_NONE
+
+
+def test_injected_ssl_context_is_used_for_recreated_sessions():
+    context = ssl.create_default_context()
+
+    async def run():
+        client = LoxoneClient(host="example.com", user="user", password="pass", ssl_context=context)
+        await client._ensure_session()
+        await client._session.close()
+        await client._ensure_session()
+        ssl_used = client._session.connector._ssl
+        await client.close()
+        return ssl_used
+
+    assert asyncio.run(run()) is context
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        b'{"LL": {"value": 1}}',
+        b'\xef\xbb\xbf{"LL": {"value": 1}}\x00\x00',
+        b'garbage {"LL": {"value": 1}} trailing',
+        '\ufeff{"LL": {"value": 1}}\x00',
+    ],
+)
+def test_parse_json_sanitises_body(body):
+    assert LoxoneClient._parse_json(body) == {"LL": {"value": 1}}
+
+
+def test_parse_json_stdlib_fallback(monkeypatch):
+    import loxone_api.client as client_module
+
+    monkeypatch.setattr(client_module, "HAS_ORJSON", False)
+    monkeypatch.setattr(client_module, "_json_loads", json.loads)
+
+    assert LoxoneClient._parse_json(b'\x00{"a": [1, 2]}\x00') == {"a": [1, 2]}
+    with pytest.raises(ValueError):
+        LoxoneClient._parse_json(b"<html>error</html>")
+
+
+def test_get_json_reports_non_json(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+
+    async def fake_get_bytes(self, path):
+        return 500, b"<html>boom</html>"
+
+    monkeypatch.setattr(LoxoneClient, "_get_bytes", fake_get_bytes)
+
+    with pytest.raises(LoxoneRequestError, match="boom"):
+        asyncio.run(client._get_json("/jdev/sps/io/x"))
+
+
+def test_large_json_bodies_are_parsed_off_the_event_loop(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    threads = []
+    parse_json = LoxoneClient._parse_json
+
+    def recording_parse_json(data):
+        threads.append(threading.get_ident())
+        return parse_json(data)
+
+    monkeypatch.setattr(LoxoneClient, "_parse_json", staticmethod(recording_parse_json))
+    small = json.dumps({"LL": {"value": 1}}).encode()
+    large = json.dumps({"controls": {"x": "y" * JSON_OFFLOAD_SIZE}}).encode()
+
+    async def run():
+        return await client._decode_json(200, small), await client._decode_json(200, large)
+
+    assert asyncio.run(run())[0] == {"LL": {"value": 1}}
+    assert threads[0] == threading.get_ident()
+    assert threads[1] != threading.get_ident()
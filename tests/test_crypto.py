@@ -0,0 +1,144 @@
+import asyncio
+import base64
+import json
+import sys
+from pathlib import Path
+from urllib.parse import unquote
+
+import pytest
+
+# Ensure the project root is on the import path for tests without installation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+pytest.importorskip("cryptography")
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import padding, rsa
+from cryptography.hazmat.primitives.ciphers import Cipher, algorithms, modes
+
+from loxone_api.client import GetKey2Result, LoxoneClient
+from loxone_api.crypto import CommandEncryptor
+
+PRIVATE_KEY = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+# getPublicKey answers with the bare key labelled as a certificate, without line breaks
+PUBLIC_KEY = (
+    "-----BEGIN CERTIFICATE-----"
+    + base64.b64encode(
+        PRIVATE_KEY.public_key().public_bytes(
+            serialization.Encoding.DER, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+    ).decode()
+    + "-----END CERTIFICATE-----"
+)
+
+
+class FakeMiniserver:
+    """Decrypts commands the way the Miniserver does, with the RSA private key."""
+
+    def __init__(self):
+        self.cipher = None
+
+    def exchange(self, session_key):
+        secret = PRIVATE_KEY.decrypt(base64.b64decode(unquote(session_key)), padding.PKCS1v15())
+        key, iv = secret.decode().split(":")
+        self.cipher = Cipher(algorithms.AES(bytes.fromhex(key)), modes.CBC(bytes.fromhex(iv)))
+
+    def decrypt(self, path):
+        enc_path, _, query = path.partition("?sk=")
+        if query:
+            self.exchange(query)
+        decryptor = self.cipher.decryptor()
+        data = base64.b64decode(unquote(enc_path.rsplit("/", 1)[1]))
+        return (decryptor.update(data) + decryptor.finalize()).rstrip(b"\0").decode()
+
+    def encrypt(self, text):
+        data = text.encode()
+        data += b"\0" * (-len(data) % 16)
+        encryptor = self.cipher.encryptor()
+        return base64.b64encode(encryptor.update(data) + encryptor.finalize())
+
+
+def test_command_encryptor_reuses_session_key_and_rotates_salt():
+    encryptor = CommandEncryptor(PUBLIC_KEY, salt_max_uses=2)
+    miniserver = FakeMiniserver()
+
+    paths = [encryptor.command_path(f"jdev/sps/io/c{i}") for i in range(3)]
+    commands = [miniserver.decrypt(path) for path in paths]
+
+    assert all(path.startswith("/jdev/sys/enc/") for path in paths)
+    assert len({path.partition("?sk=")[2] for path in paths}) == 1
+    first_salt = commands[0].split("/")[1]
+    assert commands[0] == f"salt/{first_salt}/jdev/sps/io/c0"
+    assert commands[1] == f"salt/{first_salt}/jdev/sps/io/c1"
+    new_salt = commands[2].split("/")[2]
+    assert commands[2] == f"nextSalt/{first_salt}/{new_salt}/jdev/sps/io/c2"
+    assert new_salt != first_salt
+
+    fenc = encryptor.command_path("jdev/sps/io/c3", encrypt_response=True, with_session_key=False)
+    assert fenc.startswith("/jdev/sys/fenc/") and "?sk=" not in fenc
+    assert encryptor.decrypt(encryptor.encrypt('{"LL": {}}')) == '{"LL": {}}'
+
+
+def test_authenticate_falls_back_to_encrypted_getjwt(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass")
+    miniserver = FakeMiniserver()
+    requests = []
+
+    async def fake_getkey2(self):
+        requests.append("getkey2")
+        return GetKey2Result(key="aa", salt="bb", hashAlg="SHA256")
+
+    async def fake_get_json(self, path):
+        requests.append("getPublicKey")
+        assert path == "/jdev/sys/getPublicKey"
+        return 200, {"LL": {"code": "200", "value": PUBLIC_KEY}}
+
+    async def fake_get_text(self, path):
+        assert path.startswith("/jdev/sys/getjwt/")
+        requests.append("getjwt")
+        return 400, "Bad Request"
+
+    async def fake_get_bytes(self, path):
+        # getjwt goes through fenc, so the token comes back encrypted too
+        assert path.startswith("/jdev/sys/fenc/")
+        command = miniserver.decrypt(path)
+        assert command.startswith("salt/") and "/jdev/sys/getjwt/" in command
+        requests.append("encrypted getjwt")
+        return 200, miniserver.encrypt(
+            json.dumps({"LL": {"value": {"token": "jwt-token", "validUntil": 1}}})
+        )
+
+    monkeypatch.setattr(LoxoneClient, "getkey2", fake_getkey2)
+    monkeypatch.setattr(LoxoneClient, "_get_json", fake_get_json)
+    monkeypatch.setattr(LoxoneClient, "_get_text", fake_get_text)
+    monkeypatch.setattr(LoxoneClient, "_get_bytes", fake_get_bytes)
+
+    assert asyncio.run(client.authenticate()) == "jwt-token"
+    assert asyncio.run(client.authenticate()) == "jwt-token"
+    # Later authentications go straight to the encrypted flow with the same session key
+    assert requests == [
+        "getkey2", "getjwt", "getkey2", "getPublicKey", "encrypted getjwt", "getkey2", "encrypted getjwt"
+    ]
+
+
+def test_encrypted_commands_use_enc_and_refreshjwt_uses_fenc(monkeypatch):
+    client = LoxoneClient(host="example.com", user="user", password="pass", encrypt_commands=True)
+    client._jwt = "jwt-token"
+    miniserver = FakeMiniserver()
+    sent = []
+
+    async def fake_get_bytes(self, path):
+        command = miniserver.decrypt(path)
+        sent.append((path.split("/")[3], command.split("/", 2)[2]))
+        response = json.dumps({"LL": {"code": "200", "value": "1"}})
+        return 200, miniserver.encrypt(response) if "/fenc/" in path else response.encode()
+
+    monkeypatch.setattr(LoxoneClient, "_get_bytes", fake_get_bytes)
+    client._encryptor = CommandEncryptor(PUBLIC_KEY)
+
+    async def run():
+        await client.jdev_get("sps/io/c1/on")
+        return await client.jdev_get("sys/refreshjwt/hash/user")
+
+    assert asyncio.run(run())["LL"]["value"] == "1"
+    assert sent == [("enc", "jdev/sps/io/c1/on"), ("fenc", "jdev/sys/refreshjwt/hash/user")]
@@ -0,0 +1,150 @@
+import struct
+import sys
+from pathlib import Path
+
+import pytest
+
+# Ensure the project root is on the import path for tests without installation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.events import (
+    MSG_KEEPALIVE,
+    MSG_VALUE_EVENTS,
+    decode_daytimer_events,
+    decode_text_events,
+    decode_value_events,
+    decode_weather_events,
+    iter_value_events,
+    parse_header,
+    resolve_states,
+    uuid_from_bytes,
+    uuid_to_bytes,
+)
+
+UUID_STR = "0b734138-037d-034e-ffff403fb0c34b9e"
+
+
+def uuid_bytes(uuid: str) -> bytes:
+    d1, d2, d3, d4 = uuid.split("-")
+    return struct.pack("<IHH", int(d1, 16), int(d2, 16), int(d3, 16)) + bytes.fromhex(d4)
+
+
+def test_uuid_to_bytes_round_trip():
+    assert uuid_to_bytes(UUID_STR) == uuid_bytes(UUID_STR)
+    assert uuid_from_bytes(uuid_to_bytes(UUID_STR)) == UUID_STR
+    with pytest.raises(ValueError):
+        uuid_to_bytes("0b734138-037d-034e")
+
+
+def test_parse_header():
+    header = parse_header(bytes([0x03, MSG_VALUE_EVENTS, 0x00, 0x00]) + struct.pack("<I", 48))
+    assert header.identifier == MSG_VALUE_EVENTS
+    assert header.length == 48
+    assert header.estimated is False
+    assert header.has_payload is True
+
+    keepalive = parse_header(bytes([0x03, MSG_KEEPALIVE, 0x01, 0x00, 0, 0, 0, 0]))
+    assert keepalive.estimated is True
+    assert keepalive.has_payload is False
+
+
+def test_parse_header_rejects_other_data():
+    with pytest.raises(ValueError):
+        parse_header(b"\x00" * 8)
+    with pytest.raises(ValueError):
+        parse_header(b"\x03\x00")
+
+
+def test_uuid_from_bytes_matches_structure_format():
+    assert uuid_from_bytes(uuid_bytes(UUID_STR)) == UUID_STR
+
+
+def test_decode_value_events():
+    other = "10a4b1c2-0001-0002-0102030405060708"
+    payload = uuid_bytes(UUID_STR) + struct.pack("<d", 1.5) + uuid_bytes(other) + struct.pack("<d", -2.0)
+
+    states = list(decode_value_events(payload))
+
+    assert [(s.control_uuid, s.state, s.value) for s in states] == [
+        ("", UUID_STR, 1.5),
+        ("", other, -2.0),
+    ]
+
+
+def test_iter_value_events_reads_views_and_skips_partial_entry():
+    payload = bytearray(uuid_bytes(UUID_STR) + struct.pack("<d", 3.25) + b"\x01\x02")
+
+    events = list(iter_value_events(memoryview(payload)))
+
+    assert events == [(uuid_bytes(UUID_STR), 3.25)]
+
+
+def test_decode_text_events_skips_padding():
+    other = "10a4b1c2-0001-0002-0102030405060708"
+    first = "hsv(0,100,100)".encode()  # 14 bytes -> 2 padding bytes
+    second = "Grüße".encode()
+    payload = (
+        uuid_bytes(UUID_STR) + bytes(16) + struct.pack("<I", len(first)) + first + b"\x00\x00"
+        + uuid_bytes(other) + bytes(16) + struct.pack("<I", len(second)) + second + b"\x00"
+    )
+
+    states = list(decode_text_events(payload))
+
+    assert [(s.state, s.value) for s in states] == [
+        (UUID_STR, "hsv(0,100,100)"),
+        (other, "Grüße"),
+    ]
+
+
+def test_decode_daytimer_events():
+    payload = (
+        uuid_bytes(UUID_STR)
+        + struct.pack("<di", 20.5, 2)
+        + struct.pack("<iiiid", 1, 360, 480, 0, 21.0)
+        + struct.pack("<iiiid", 2, 1080, 1320, 1, 19.0)
+    )
+
+    (state,) = decode_daytimer_events(payload)
+
+    assert state.state == UUID_STR
+    assert state.value == {
+        "default": 20.5,
+        "entries": [
+            {"mode": 1, "from": 360, "to": 480, "needActivate": False, "value": 21.0},
+            {"mode": 2, "from": 1080, "to": 1320, "needActivate": True, "value": 19.0},
+        ],
+    }
+
+
+def test_decode_weather_events_stops_at_truncated_entry():
+    entry = struct.pack("<iiiiidddddd", 100, 3, 180, 250, 60, 12.5, 11.0, 5.0, 0.2, 3.4, 1013.0)
+    payload = uuid_bytes(UUID_STR) + struct.pack("<Ii", 500, 1) + entry
+    truncated = payload + uuid_bytes(UUID_STR) + struct.pack("<Ii", 501, 1) + entry[:10]
+
+    (state,) = decode_weather_events(truncated)
+
+    assert state.value["lastUpdate"] == 500
+    assert state.value["entries"] == [
+        {
+            "timestamp": 100,
+            "weatherType": 3,
+            "windDirection": 180,
+            "solarRadiation": 250,
+            "relativeHumidity": 60,
+            "temperature": 12.5,
+            "perceivedTemperature": 11.0,
+            "dewPoint": 5.0,
+            "precipitation": 0.2,
+            "windSpeed": 3.4,
+            "barometricPressure": 1013.0,
+        }
+    ]
+
+
+def test_resolve_states_routes_by_binary_uuid():
+    index = {uuid_bytes(UUID_STR): ("control-uuid", "active")}
+    events = [(uuid_bytes(UUID_STR), 1.0), (bytes(16), 2.0)]
+
+    states = list(resolve_states(events, index))
+
+    assert [(s.control_uuid, s.state, s.value) for s in states] == [("control-uuid", "active", 1.0)]
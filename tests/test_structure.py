@@ -0,0 +1,191 @@
+import gc
+import json
+import sys
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+# Ensure the project root is on the import path for tests without installation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.models import LoxoneControl
+from loxone_api.structure import (
+    ControlIndex,
+    ControlsDiff,
+    StructureParser,
+    build_controls,
+    diff_controls,
+)
+
+
+def control(uuid, name="Light", type="Switch", **kwargs):
+    return LoxoneControl(uuid=uuid, name=name, type=type, **kwargs)
+
+
+def test_diff_controls_reports_added_removed_and_changed():
+    old = {"a": control("a"), "b": control("b"), "c": control("c", states={"active": "s1"})}
+    new = {"a": control("a"), "c": control("c", states={"active": "s2"}), "d": control("d")}
+
+    diff = diff_controls(old, new)
+
+    assert diff == ControlsDiff(added=("d",), removed=("b",), changed=("c",))
+    assert diff
+
+
+def test_diff_controls_of_identical_maps_is_empty():
+    controls = {"a": control("a", room="Kitchen")}
+
+    assert not diff_controls(controls, {"a": control("a", room="Kitchen")})
+
+
+STRUCTURE = {
+    "rooms": {"r1": {"name": "Kitchen"}},
+    "cats": {"c1": {"name": "Lights"}},
+    "controls": {
+        "lc": {
+            "name": "Lights",
+            "type": "LightControllerV2",
+            "room": "r1",
+            "cat": "c1",
+            "states": {"activeMoods": "s-moods"},
+            "details": {"movementScene": 1, "defaultSetpoint": 21},
+            "subControls": {
+                "lc/AI1": {"name": "Pendant", "type": "Dimmer", "states": {"position": "s-pos"}},
+            },
+        },
+        "broken": "not a control",
+    },
+}
+
+
+def test_build_controls_links_subcontrols_to_parent():
+    controls = build_controls(STRUCTURE)
+
+    assert set(controls) == {"lc", "lc/lc/AI1"}
+    sub = controls["lc/lc/AI1"]
+    assert sub.name == "Lights - Pendant"
+    assert (sub.room, sub.category) == ("Kitchen", "Lights")
+    assert (sub.parent_uuid, sub.subcontrol_id) == ("lc", "lc/AI1")
+    assert dict(sub.states) == {"position": "s-pos"}
+    assert not sub.details
+
+
+def test_build_controls_is_compact_and_read_only():
+    controls = build_controls(STRUCTURE, detail_keys={"defaultSetpoint"})
+    parent = controls["lc"]
+
+    assert dict(parent.details) == {"defaultSetpoint": 21}
+    assert not hasattr(parent, "__dict__")
+    with pytest.raises(TypeError):
+        parent.states["activeMoods"] = "other"
+    # Interned strings are shared rather than copied per control
+    type_name = "".join(["Light", "ControllerV2"])
+    assert sys.intern(type_name) is parent.type
+
+
+def large_structure(controls=2000):
+    rooms = {f"room-{i}": {"name": f"Room {i}", "image": "x.svg"} for i in range(20)}
+    structure = {"rooms": rooms, "cats": {}, "controls": {}}
+    for i in range(controls):
+        uuid = f"{i:08x}-0000-0000-{i:016x}"
+        structure["controls"][uuid] = {
+            "name": f"Control {i}",
+            "type": "Jalousie",
+            "room": f"room-{i % 20}",
+            "details": {"isAutomatic": True, "animation": i % 3, "ranges": [{"min": 0, "max": 100}]},
+            "states": {name: f"{uuid}-{name}" for name in ("up", "down", "position", "shadePosition")},
+            "statistic": {"frequency": 1, "outputs": [{"id": 0, "name": "Position"}]},
+        }
+    return structure
+
+
+def test_build_controls_lets_the_structure_be_freed():
+    gc.collect()
+    tracemalloc.start()
+    try:
+        structure = large_structure()
+        structure_size, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+
+        controls = build_controls(structure)
+        _, peak = tracemalloc.get_traced_memory()
+        nested = structure["controls"][next(iter(controls))]["details"]["ranges"]
+        del structure
+        gc.collect()
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert len(controls) == 2000
+    # Building adds well under the structure's own size on top of it...
+    assert peak - structure_size < 0.6 * structure_size
+    # ...and once it is dropped only the model (plus shared strings) remains
+    assert retained < 0.8 * structure_size
+    # Nested detail values are copies, nothing points into the raw tree any more
+    assert gc.get_referrers(nested) == []
+
+
+def feed_in_chunks(data, size, parser=None):
+    parser = parser or StructureParser()
+    for start in range(0, len(data), size):
+        parser.feed(data[start : start + size])
+    return parser.close()
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64, 1 << 20])
+def test_structure_parser_matches_build_controls(chunk_size):
+    body = json.dumps({"lastModified": "2024", "serial": 1234567, **STRUCTURE}).encode()
+
+    parsed = feed_in_chunks(body, chunk_size)
+
+    assert parsed.controls == build_controls(STRUCTURE)
+    assert parsed.sections == {
+        "lastModified": "2024",
+        "serial": 1234567,
+        "rooms": STRUCTURE["rooms"],
+        "cats": STRUCTURE["cats"],
+    }
+
+
+def test_structure_parser_resolves_rooms_listed_after_controls():
+    reordered = {"controls": STRUCTURE["controls"], "rooms": STRUCTURE["rooms"], "cats": STRUCTURE["cats"]}
+    body = "\ufeff".encode() + json.dumps(reordered, indent=2).encode() + b"\x00\x00"
+
+    parsed = feed_in_chunks(body, 7, StructureParser(detail_keys=()))
+
+    assert parsed.controls["lc/lc/AI1"].room == "Kitchen"
+    assert parsed.controls["lc"].category == "Lights"
+    assert not parsed.controls["lc"].details
+
+
+def test_structure_parser_rejects_truncated_file():
+    body = json.dumps(STRUCTURE).encode()
+
+    with pytest.raises(ValueError):
+        feed_in_chunks(body[:-10], 16)
+    with pytest.raises(ValueError):
+        feed_in_chunks(b"<html>Unauthorized</html>", 16)
+
+
+def test_control_index_groups_by_type_parent_and_name():
+    controls = {
+        "lc": control("lc", name="Living", type="LightControllerV2"),
+        "lc/a": control("lc/a", name="Living - Pendant", type="Dimmer", parent_uuid="lc"),
+        "lc/b": control("lc/b", name="Living - pendant ", type="ColorPickerV2", parent_uuid="lc"),
+        "lc/c": control("lc/c", name="Living - Spots", type="Dimmer", parent_uuid="lc"),
+        "sw": control("sw", name="Hall"),
+    }
+
+    index = ControlIndex(controls)
+
+    assert [c.uuid for c in index.of_type("dimmer")] == ["lc/a", "lc/c"]
+    assert {c.uuid for c in index.of_type("Switch", "lightcontrollerv2")} == {"sw", "lc"}
+    assert index.of_type("jalousie") == []
+    assert [c.uuid for c in index.children("lc")] == ["lc/a", "lc/b", "lc/c"]
+    assert index.children("sw") == ()
+    groups = index.name_groups("lc")
+    assert {name: [c.uuid for c in group] for name, group in groups.items()} == {
+        "pendant": ["lc/a", "lc/b"],
+        "spots": ["lc/c"],
+    }
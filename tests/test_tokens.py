@@ -0,0 +1,116 @@
+import asyncio
+import json
+import stat
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# Ensure the project root is on the import path for tests without installation
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from loxone_api.client import GetKey2Result, LoxoneClient
+from loxone_api.const import LOXONE_EPOCH
+from loxone_api.tokens import FileTokenStore, StoredToken, TokenStore
+
+TOKEN = StoredToken(token="stored-token", valid_until=time.time() + 3600, client_uuid="uuid-1")
+
+
+def test_file_token_store_round_trip(tmp_path):
+    store = FileTokenStore(tmp_path / "tokens")
+
+    async def run():
+        assert await store.load("user@host:443") is None
+        await store.save("user@host:443", TOKEN)
+        loaded = await store.load("user@host:443")
+        await store.clear("user@host:443")
+        return loaded, await store.load("user@host:443")
+
+    loaded, cleared = asyncio.run(run())
+
+    assert loaded == TOKEN
+    assert cleared is None
+
+
+def test_file_token_store_is_private_and_tolerates_garbage(tmp_path):
+    store = FileTokenStore(tmp_path)
+    asyncio.run(store.save("user@host:443", TOKEN))
+    path = store.path_for("user@host:443")
+
+    assert stat.S_IMODE(path.stat().st_mode) == 0o600
+    path.write_text("{not json")
+    assert asyncio.run(store.load("user@host:443")) is None
+    path.write_text(json.dumps({"token": ""}))
+    assert asyncio.run(store.load("user@host:443")) is None
+
+
+def make_client(monkeypatch, tmp_path, checktoken_code="200"):
+    store = FileTokenStore(tmp_path)
+    client = LoxoneClient(host="example.com", user="user", password="pass", token_store=store)
+    calls = []
+
+    async def fake_get_json(self, path):
+        calls.append(path.split("/")[3])
+        if path == "/jdev/sys/getkey":
+            return 200, {"LL": {"code": "200", "value": "41424344"}}
+        assert path.startswith("/jdev/sys/checktoken/") and self.jwt == "stored-token"
+        valid_until = int(time.time()) - LOXONE_EPOCH + 7200
+        return 200, {"LL": {"code": checktoken_code, "value": {"validUntil": valid_until}}}
+
+    async def fake_getkey2(self):
+        calls.append("getkey2")
+        return GetKey2Result(key="aa", salt="bb", hashAlg="SHA256")
+
+    async def fake_get_text(self, path):
+        calls.append(path.split("/")[3])
+        return 200, json.dumps({"LL": {"value": {"token": "new-token", "validUntil": 1}}})
+
+    monkeypatch.setattr(LoxoneClient, "_get_json", fake_get_json)
+    monkeypatch.setattr(LoxoneClient, "getkey2", fake_getkey2)
+    monkeypatch.setattr(LoxoneClient, "_get_text", fake_get_text)
+    return client, store, calls
+
+
+def test_ensure_token_reuses_stored_token(monkeypatch, tmp_path):
+    client, store, calls = make_client(monkeypatch, tmp_path)
+    asyncio.run(store.save(client.token_key, TOKEN))
+
+    assert asyncio.run(client.ensure_token()) == "stored-token"
+    assert calls == ["getkey", "checktoken"]
+    assert client.client_uuid == "uuid-1"
+    assert client.token_valid_until > TOKEN.valid_until
+
+
+def test_rejected_token_is_replaced_under_the_same_client_uuid(monkeypatch, tmp_path):
+    client, store, calls = make_client(monkeypatch, tmp_path, checktoken_code="401")
+    asyncio.run(store.save(client.token_key, TOKEN))
+
+    assert asyncio.run(client.ensure_token()) == "new-token"
+    assert calls == ["getkey", "checktoken", "getkey2", "getjwt"]
+
+    saved = asyncio.run(store.load(client.token_key))
+    assert saved.token == "new-token"
+    assert saved.client_uuid == "uuid-1"
+    assert saved.hash_alg == "SHA256"
+    assert saved.valid_until == LOXONE_EPOCH + 1
+
+
+def test_authenticate_keeps_one_client_uuid(monkeypatch, tmp_path):
+    client, store, calls = make_client(monkeypatch, tmp_path)
+
+    asyncio.run(client.authenticate())
+    first = client.client_uuid
+    asyncio.run(client.authenticate())
+
+    assert first and client.client_uuid == first
+    assert asyncio.run(store.load(client.token_key)).client_uuid == first
+
+
+def test_partial_token_store_cannot_be_created():
+    class LoadOnly(TokenStore):
+        async def load(self, key):
+            return None
+
+    with pytest.raises(TypeError):
+        LoadOnly()